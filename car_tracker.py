@@ -3,10 +3,43 @@ import streamlit as st
 import pandas as pd
 import datetime as dt
 import os
+import atexit
 import hashlib
+import hmac
 import plotly.express as px
 import plotly.graph_objects as go
 import json
+import collections
+import csv
+import functools
+import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # optional; export/import fall back to stdlib json
+
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None  # optional; fast_sum falls back to pandas
+
+try:
+    import numba
+except ImportError:
+    numba = None  # optional; fast_sum falls back to numexpr/pandas
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _njit_sum(values):
+        total = 0
+        for v in values:
+            total += v
+        return total
+else:
+    _njit_sum = None
 
 # ---------- Dark Theme Configuration ----------
 def apply_dark_theme():
@@ -28,6 +61,27 @@ def apply_dark_theme():
     .stDataFrame {
         background-color: #262730;
     }
+    /* Keyframes for the pending-booking banner and badge live here so the
+       conditional HTML blocks only ship the varying <div> per rerun */
+    @keyframes pulse-notification {
+        0% {
+            box-shadow: 0 4px 15px rgba(255, 107, 107, 0.4);
+            transform: scale(1);
+        }
+        50% {
+            box-shadow: 0 6px 25px rgba(255, 107, 107, 0.7);
+            transform: scale(1.02);
+        }
+        100% {
+            box-shadow: 0 4px 15px rgba(255, 107, 107, 0.4);
+            transform: scale(1);
+        }
+    }
+    @keyframes bounce-badge {
+        0%, 20%, 50%, 80%, 100% { transform: translateY(0); }
+        40% { transform: translateY(-5px); }
+        60% { transform: translateY(-2px); }
+    }
     </style>
     """, unsafe_allow_html=True)
 
@@ -35,16 +89,27 @@ st.set_page_config(page_title="🚗 Car Booking & Tracking", layout="wide")
 apply_dark_theme()
 
 # ---------- Persistent Storage Functions ----------
+@st.cache_resource
+def _persistent_store():
+    """One process-wide record store shared by every session.
+
+    Keeping this behind cache_resource means multiple tabs of the same
+    user reference the same dict instead of each session materializing
+    its own copy, and a public visitor's pending booking is visible to
+    the owner's session without a disk round-trip.
+    """
+    return {
+        'users': {},
+        'cars': {},
+        'bookings': {},
+        'expenses': {},
+        'pending_bookings': {}  # Add pending_bookings to initial storage
+    }
+
 def init_persistent_storage():
-    """Initialize persistent data storage across sessions"""
+    """Point this session at the shared store"""
     if 'persistent_data' not in st.session_state:
-        st.session_state.persistent_data = {
-            'users': {},
-            'cars': {},
-            'bookings': {},
-            'expenses': {},
-            'pending_bookings': {}  # Add pending_bookings to initial storage
-        }
+        st.session_state.persistent_data = _persistent_store()
 
 def save_to_persistent_storage(data_type, user_id, data):
     """Save data to persistent storage"""
@@ -82,136 +147,719 @@ def load_from_persistent_storage(data_type, user_id, columns):
 init_persistent_storage()
 
 # ---------- Authentication Functions ----------
-def hash_password(password):
-    return hashlib.sha256(str.encode(password)).hexdigest()
+@functools.lru_cache(maxsize=2048)
+def _derive_key(password, salt_hex):
+    """Salted scrypt derived key; memoized so reruns in one session don't
+    repay the KDF cost for the same credentials"""
+    return hashlib.scrypt(str.encode(password), salt=bytes.fromhex(salt_hex),
+                          n=2**14, r=8, p=1, dklen=32).hex()
+
+def new_password_record(password):
+    """(salt_hex, key_hex) for a fresh per-user random salt"""
+    salt_hex = os.urandom(16).hex()
+    return salt_hex, _derive_key(password, salt_hex)
+
+def verify_password(password, stored_hash, salt=""):
+    """Check a password against a stored hash.
+
+    Salted records verify via scrypt. Rows written before the salt column
+    existed carry 64-char SHA-256 or 32-char blake2b hex; verify those
+    against the old algorithms so existing accounts keep working.
+    """
+    if salt:
+        return hmac.compare_digest(_derive_key(password, str(salt)), str(stored_hash))
+    if len(str(stored_hash)) == 64:
+        return hmac.compare_digest(
+            hashlib.sha256(str.encode(password)).hexdigest(), str(stored_hash))
+    return hmac.compare_digest(
+        hashlib.blake2b(str.encode(password), digest_size=16).hexdigest(), str(stored_hash))
+
+USER_FIELDS = ["username", "password", "salt", "full_name", "created_date"]
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _read_users_csv(mtime):
+    """Parse users.csv once per (mtime, ttl) instead of per auth attempt.
+
+    Auth only ever needs row dicts, so stdlib csv does the job without
+    materializing a DataFrame.
+    """
+    with open("users.csv", newline="") as f:
+        return list(csv.DictReader(f))
+
+def _write_users_csv(records):
+    # Union of keys so legacy rows without a salt column still round-trip
+    fields = list(USER_FIELDS)
+    for record in records:
+        for field in record:
+            if field not in fields:
+                fields.append(field)
+    try:
+        with open("users.csv", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, restval="")
+            writer.writeheader()
+            writer.writerows(records)
+    except Exception:
+        pass
 
 def load_users():
-    # First try persistent storage
-    users_df = load_from_persistent_storage('users', None, ["username", "password", "full_name", "created_date"])
-    
-    if not users_df.empty:
-        return users_df
-    
-    # Fall back to CSV file
+    """User rows as plain dicts; the auth path never touches pandas"""
+    if 'persistent_data' not in st.session_state:
+        init_persistent_storage()
+    store = st.session_state.persistent_data.setdefault('users', {})
+    records = store.get('users')
+    if isinstance(records, list) and records:
+        return records
+
     if os.path.exists("users.csv"):
-        users_df = pd.read_csv("users.csv")
-        # Save to persistent storage
-        save_to_persistent_storage('users', None, users_df)
-        return users_df
+        records = list(_read_users_csv(os.path.getmtime("users.csv")))
     else:
         # Create default admin user
-        default_user = pd.DataFrame({
-            "username": ["admin"], 
-            "password": [hash_password("admin123")], 
-            "full_name": ["System Administrator"],
-            "created_date": [dt.date.today().strftime("%Y-%m-%d")]
-        })
-        save_to_persistent_storage('users', None, default_user)
-        default_user.to_csv("users.csv", index=False)
-        return default_user
+        admin_salt, admin_key = new_password_record("admin123")
+        records = [{
+            "username": "admin",
+            "password": admin_key,
+            "salt": admin_salt,
+            "full_name": "System Administrator",
+            "created_date": dt.date.today().isoformat(),
+        }]
+        _write_users_csv(records)
+    store['users'] = records
+    return records
 
-def authenticate(username, password):
+def user_directory():
+    """username -> (password_hash, full_name, salt), rebuilt when the user count changes"""
     users = load_users()
-    hashed_password = hash_password(password)
-    user = users[(users["username"] == username) & (users["password"] == hashed_password)]
-    return not user.empty, user.iloc[0]["full_name"] if not user.empty else ""
+    cached = st.session_state.get('user_directory')
+    if cached is not None and cached[0] == len(users):
+        return cached[1]
+    directory = {
+        u.get('username', ''): (u.get('password', ''), u.get('full_name', ''), u.get('salt', ''))
+        for u in users
+    }
+    st.session_state.user_directory = (len(users), directory)
+    return directory
+
+def authenticate(username, password):
+    record = user_directory().get(username)
+    if record is None or not verify_password(password, record[0], record[2]):
+        return False, ""
+    return True, record[1]
 
 def register_user(username, password, full_name):
     users = load_users()
-    if username in users["username"].values:
+    if username in user_directory():
         return False, "Username already exists"
     
-    new_user = pd.DataFrame({
-        "username": [username],
-        "password": [hash_password(password)],
-        "full_name": [full_name],
-        "created_date": [dt.date.today().strftime("%Y-%m-%d")]
-    })
-    users = pd.concat([users, new_user], ignore_index=True)
-    save_to_persistent_storage('users', None, users)
-    users.to_csv("users.csv", index=False)
+    salt_hex, key_hex = new_password_record(password)
+    new_user = {
+        "username": username,
+        "password": key_hex,
+        "salt": salt_hex,
+        "full_name": full_name,
+        "created_date": dt.date.today().isoformat(),
+    }
+    # load_users hands back the shared record list, so appending in place
+    # updates the store; the CSV rewrite rides the background writer
+    users.append(new_user)
+    _persist_executor().submit(_write_users_csv, list(users))
+    _read_users_csv.clear()
+    st.session_state.pop('user_directory', None)
     return True, "User registered successfully"
 
 # ---------- Enhanced Data Management Functions ----------
+# Declared once so reloads always produce typed columns and the Dashboard
+# can sum amounts directly without per-render pd.to_numeric coercion
+TABLE_SCHEMAS = {
+    "cars": {"id": "int32"},
+    "bookings": {"id": "int32", "car_id": "int32", "amount_paid": "int64"},
+    "expenses": {"id": "int32", "car_id": "int32", "amount": "int64"},
+}
+
+# Date-typed columns per table: parsed once at load, held as date objects,
+# and persisted by Parquet as date32 so reloads never parse strings
+DATE_COLUMNS = {
+    "bookings": ("start_date", "end_date"),
+    "expenses": ("date",),
+    "cars": ("last_service_date", "next_service_date"),
+}
+
+# Column order per table; menu branches lazy-load through get_table so a
+# session that never opens Expenses never reads that file
+TABLE_COLUMNS = {
+    "cars": ["id", "car_name", "plate_number", "model", "status", "last_service_date", "next_service_date"],
+    "bookings": ["id", "car_id", "client_name", "start_date", "end_date", "amount_paid", "status"],
+    "expenses": ["id", "car_id", "date", "description", "amount", "type"],
+}
+
+def get_table(name):
+    """Load one user table into the session on first use"""
+    if name not in st.session_state:
+        st.session_state[name] = load_data(
+            f"{name}.csv", TABLE_COLUMNS[name], st.session_state.current_user)
+        if name == 'bookings' and 'recent_bookings' not in st.session_state:
+            st.session_state.recent_bookings = collections.deque(
+                st.session_state.bookings.tail(5).to_dict('records'), maxlen=5)
+    return st.session_state[name]
+
+def table_row_count(name):
+    """Row count for the sidebar summary without materializing the table.
+
+    Uses the loaded frame when present, otherwise the Parquet footer's
+    row count, so displaying counts doesn't defeat the lazy loading.
+    """
+    frame = st.session_state.get(name)
+    if frame is not None:
+        return len(frame)
+    path = f"{st.session_state.current_user}_{name}.parquet"
+    if os.path.exists(path):
+        try:
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(path).metadata.num_rows
+        except Exception:
+            pass
+    return len(get_table(name))
+
+# The UI only ever assigns these values, so the category sets can be fixed
+CAR_STATUSES = ["Available", "Booked", "Maintenance"]
+BOOKING_STATUSES = ["Booked", "Confirmed", "Completed", "Cancelled"]
+EXPENSE_TYPES = ["Fuel", "Maintenance", "Insurance", "Repairs", "Other"]
+CATEGORY_COLUMNS = {
+    "cars": {"status": CAR_STATUSES},
+    "bookings": {"status": BOOKING_STATUSES},
+    "expenses": {"type": EXPENSE_TYPES},
+}
+
+def apply_table_schema(df, data_type):
+    """Coerce numeric columns to their declared dtypes.
+
+    Parquet round-trips already come back typed, so the common case is a
+    dtype comparison per column with no coercion work at all; only legacy
+    CSV loads and record-rebuilt frames pay for pd.to_numeric.
+    """
+    for col, dtype in TABLE_SCHEMAS.get(data_type, {}).items():
+        if col in df.columns and str(df[col].dtype) != dtype:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(dtype)
+    if not df.empty:
+        for col, categories in CATEGORY_COLUMNS.get(data_type, {}).items():
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = pd.Categorical(df[col], categories=categories).fillna(categories[0])
+        for col in DATE_COLUMNS.get(data_type, ()):
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if str(series.dtype).startswith('datetime64'):
+                df[col] = series.dt.date
+            else:
+                # Handles ISO strings, freshly appended mixed rows, and
+                # already-converted date objects alike
+                df[col] = pd.to_datetime(series, format="%Y-%m-%d", errors='coerce').dt.date
+    return df
+
+def empty_table(data_type, columns):
+    """Typed empty frame, so downstream sums and filters need no guards"""
+    return apply_table_schema(pd.DataFrame(columns=columns), data_type)
+
+def available_car_ids(cars_df, owner=""):
+    """Set of ids for the owner's cars currently marked Available.
+
+    Built once per session per owner and kept up to date by
+    update_car_status, so availability checks are O(1) membership tests
+    instead of a status-column scan on every rerun. Keyed by owner since
+    the public page renders other owners' fleets, whose car ids overlap.
+    """
+    sets = st.session_state.setdefault('available_car_ids', {})
+    if owner not in sets:
+        sets[owner] = set(
+            cars_df.loc[cars_df['status'] == 'Available', 'id'].tolist()
+        )
+    return sets[owner]
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=64)
+def _read_table(path, mtime):
+    """Parse a table file once per (path, mtime).
+
+    The mtime argument is only there as a cache key: when a background write
+    touches the file the key changes and the stale entry is bypassed. With
+    persist="disk" warm restarts skip the parse entirely.
+    """
+    if path.endswith('.parquet'):
+        # Copy off the read-only Arrow buffers: on a cache miss this exact
+        # frame lands in the session, and in-place status writes would
+        # raise "assignment destination is read-only"
+        return pd.read_parquet(path, engine='pyarrow').copy()
+    try:
+        # pyarrow's multithreaded C++ tokenizer with the declared column
+        # types, so numeric columns skip inference; anything else is
+        # normalized afterwards by apply_table_schema
+        from pyarrow import csv as pa_csv
+        return pa_csv.read_csv(
+            path, convert_options=_csv_convert_options(path)).to_pandas()
+    except Exception:
+        return pd.read_csv(path)
+
+def _csv_convert_options(path):
+    """Reusable ConvertOptions carrying the table's declared dtypes.
+
+    Built once per table name and cached, so repeated loads share the
+    same precompiled schema object.
+    """
+    data_type = os.path.basename(path).rsplit('.', 1)[0].rsplit('_', 1)[-1]
+    if data_type not in _CSV_CONVERT_OPTIONS:
+        from pyarrow import csv as pa_csv
+        import pyarrow as pa
+        type_map = {'int32': pa.int32(), 'int64': pa.int64()}
+        column_types = {
+            col: type_map[dtype]
+            for col, dtype in TABLE_SCHEMAS.get(data_type, {}).items()
+            if dtype in type_map
+        }
+        _CSV_CONVERT_OPTIONS[data_type] = (
+            pa_csv.ConvertOptions(column_types=column_types) if column_types else None)
+    return _CSV_CONVERT_OPTIONS[data_type]
+
+_CSV_CONVERT_OPTIONS = {}
+
 def load_data(filename, columns, user_prefix=""):
     """Load data with persistent storage priority"""
     data_type = filename.replace('.csv', '')
-    
+
     # First try persistent storage
     df = load_from_persistent_storage(data_type, user_prefix, columns)
     if not df.empty:
+        return index_by_id(apply_table_schema(df, data_type))
+
+    # Fall back to disk: Parquet first, legacy CSV as one-time migration
+    full_filename = f"{user_prefix}_{filename}" if user_prefix else filename
+    parquet_filename = full_filename.replace('.csv', '.parquet')
+    try:
+        migrating_csv = False
+        if os.path.exists(parquet_filename):
+            df = _read_table(parquet_filename, os.path.getmtime(parquet_filename))
+        elif os.path.exists(full_filename):
+            df = _read_table(full_filename, os.path.getmtime(full_filename))
+            migrating_csv = True
+        else:
+            return empty_table(data_type, columns)
+        df = _replay_journal(df, _journal_path(filename, user_prefix))
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            # One C-level reindex pass instead of a BlockManager copy per column
+            df = df.reindex(columns=[*df.columns, *missing], fill_value="")
+        df = apply_table_schema(df, data_type)
+        if migrating_csv:
+            # One-time CSV→Parquet migration, so the typed columnar file
+            # exists even if the user never saves anything this session
+            _schedule_parquet_write(df, filename, user_prefix)
+        df = index_by_id(df)
+        # Save to persistent storage for next time
+        save_to_persistent_storage(data_type, user_prefix, df)
         return df
-    
-    # Fall back to CSV file
+    except Exception:
+        return empty_table(data_type, columns)
+
+@st.cache_resource
+def _persist_executor():
+    """Single background thread that owns all disk writes.
+
+    One worker serializes writes in submission order (so there is never a
+    concurrent write to the same path), and shutdown is registered so queued
+    writes flush before the server exits.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist")
+    atexit.register(executor.shutdown, wait=True)
+    return executor
+
+# Inserts are journaled as JSON lines and only compacted into the Parquet
+# file once this many rows accumulate (or an edit forces a full rewrite)
+JOURNAL_COMPACT_ROWS = 64
+
+def _journal_path(filename, user_prefix=""):
     full_filename = f"{user_prefix}_{filename}" if user_prefix else filename
-    if os.path.exists(full_filename):
-        try:
-            df = pd.read_csv(full_filename)
-            for col in columns:
-                if col not in df.columns:
-                    df[col] = ""
-            # Save to persistent storage for next time
-            save_to_persistent_storage(data_type, user_prefix, df)
-            return df
-        except Exception:
-            return pd.DataFrame(columns=columns)
-    else:
-        return pd.DataFrame(columns=columns)
+    return full_filename.replace('.csv', '.journal')
 
-def save_data(df, filename, user_prefix=""):
-    """Save data to both persistent storage and CSV"""
+def _append_journal_line(path, line):
+    # O(1) durability for a single insert: one appended JSON line instead
+    # of an O(N) table rewrite; runs on the writer thread
+    try:
+        with open(path, 'a') as f:
+            f.write(line + '\n')
+    except Exception:
+        pass
+
+def _replay_journal(df, journal_path):
+    """Fold journaled inserts that landed after the last compaction back
+    into the frame; rows already compacted are skipped by id"""
+    if not os.path.exists(journal_path):
+        return df
+    try:
+        with open(journal_path) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    except Exception:
+        return df
+    if rows and 'id' in df.columns and not df.empty:
+        seen = set(df['id'].tolist())
+        rows = [r for r in rows if r.get('id') not in seen]
+    if rows:
+        df = pd.concat([df, pd.DataFrame(rows)], ignore_index=True)
+    return df
+
+def _write_parquet(df, path, journal_path=None):
+    # Write to a temp file and os.replace so a crash mid-write never leaves
+    # a truncated table behind; paired writes (bookings + cars on a booking
+    # submit) queue back-to-back on the single writer thread
+    try:
+        tmp_path = path + '.tmp'
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+        # fsync before the rename so the replace can't land ahead of the
+        # data on a power loss — the rename is then the commit point
+        with open(tmp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        # The snapshot includes everything journaled before this task was
+        # queued, so the journal can be truncated once the table is durable
+        if journal_path and os.path.exists(journal_path):
+            open(journal_path, 'w').close()
+    except Exception:
+        pass  # A failed background write must not take down the app
+
+def _schedule_parquet_write(df, filename, user_prefix=""):
+    """Hand the Parquet write to the background thread so the rerun doesn't
+    block on disk; snapshot the frame first since the UI may mutate it"""
     data_type = filename.replace('.csv', '')
-    
-    # Save to persistent storage (primary)
-    save_to_persistent_storage(data_type, user_prefix, df)
-    
-    # Also save to CSV file for backup
     full_filename = f"{user_prefix}_{filename}" if user_prefix else filename
+    parquet_filename = full_filename.replace('.csv', '.parquet')
     try:
-        df.to_csv(full_filename, index=False)
+        snapshot = apply_table_schema(df, data_type).copy()
+        _persist_executor().submit(_write_parquet, snapshot, parquet_filename,
+                                   _journal_path(filename, user_prefix))
     except Exception:
-        pass  # Don't fail if CSV write fails
+        pass  # Don't fail if disk write fails
+
+@st.cache_resource
+def _dirty_registry():
+    """Process-wide map of frames awaiting a flush.
+
+    Sessions debounce their own flushes, but a user can edit and close the
+    tab without ever rerunning again — this registry keeps a reference to
+    every still-dirty frame so interpreter exit can write them out instead
+    of losing the edits with the session.
+    """
+    registry = {}
+
+    def _flush_at_exit():
+        for (filename, user_prefix), frame in list(registry.items()):
+            full_filename = f"{user_prefix}_{filename}" if user_prefix else filename
+            try:
+                _write_parquet(apply_table_schema(frame, filename.replace('.csv', '')),
+                               full_filename.replace('.csv', '.parquet'),
+                               _journal_path(filename, user_prefix))
+            except Exception:
+                pass
+        registry.clear()
+
+    # Writes directly rather than through the executor, so it is correct
+    # regardless of atexit ordering against the writer-thread shutdown
+    atexit.register(_flush_at_exit)
+    return registry
+
+def mark_dirty(df, filename, user_prefix=""):
+    """Queue a table for the next Parquet flush.
+
+    A burst of mutations in one rerun (e.g. a booking approval touches
+    bookings and cars several times) coalesces into one write per table.
+    """
+    st.session_state.setdefault('dirty_tables', {})[(filename, user_prefix)] = df
+    _dirty_registry()[(filename, user_prefix)] = df
+
+# Minimum seconds between rerun-driven flushes; logout and Save Now force
+FLUSH_INTERVAL = 5.0
+
+def flush_dirty_tables(force=False):
+    """Schedule background writes for every dirty table and clear the queue.
+
+    Rerun-driven calls are debounced so a burst of approvals amortizes to
+    one rewrite per table per interval; inserts stay durable throughout
+    via the journal.
+    """
+    dirty = st.session_state.get('dirty_tables')
+    if not dirty:
+        return
+    now = time.monotonic()
+    if not force and now - st.session_state.get('last_flush', 0.0) < FLUSH_INTERVAL:
+        return
+    st.session_state.last_flush = now
+    counts = st.session_state.get('journal_counts', {})
+    registry = _dirty_registry()
+    for (filename, user_prefix), df in dirty.items():
+        _schedule_parquet_write(df, filename, user_prefix)
+        counts.pop((filename, user_prefix), None)
+        registry.pop((filename, user_prefix), None)
+    dirty.clear()
+
+def save_data(df, filename, user_prefix=""):
+    """Save data to both persistent storage and Parquet"""
+    data_type = filename.replace('.csv', '')
+
+    # Save to persistent storage (primary)
+    save_to_persistent_storage(data_type, user_prefix, df)
+
+    if data_type == 'bookings':
+        # Booking writes invalidate the memoized conflict check
+        st.session_state.pop('_last_conflict_key', None)
+
+    mark_dirty(df, filename, user_prefix)
+
+def save_new_row(df, new_row, filename, user_prefix=""):
+    """Insert fast path: append one record to the session store.
+
+    Edits and deletes re-serialize the whole frame through save_data, but
+    plain inserts only append the new row dict — Parquet is columnar and
+    can't be appended to, so the O(N) file rewrite happens off-thread while
+    the primary store gets an O(1) append.
+    """
+    data_type = filename.replace('.csv', '')
+    if data_type == 'bookings':
+        # Booking inserts invalidate the memoized conflict check
+        st.session_state.pop('_last_conflict_key', None)
+    if 'persistent_data' not in st.session_state:
+        init_persistent_storage()
+    store = st.session_state.persistent_data.setdefault(data_type, {})
+    key = f"{user_prefix}_{data_type}" if user_prefix else data_type
+    records = store.get(key)
+    if isinstance(records, list):
+        records.append(dict(new_row))
+    else:
+        store[key] = df.to_dict('records')
+
+    # Journal the insert instead of queueing a full rewrite; the Parquet
+    # compaction only runs once enough inserts pile up, on an edit flush,
+    # or at logout/Save Now
+    _persist_executor().submit(_append_journal_line,
+                               _journal_path(filename, user_prefix),
+                               json.dumps(dict(new_row), default=str))
+    counts = st.session_state.setdefault('journal_counts', {})
+    table_key = (filename, user_prefix)
+    counts[table_key] = counts.get(table_key, 0) + 1
+    if counts[table_key] >= JOURNAL_COMPACT_ROWS:
+        mark_dirty(df, filename, user_prefix)
+        counts.pop(table_key, None)
+
+# Rows per page for the big table views; only the visible window is
+# serialized to the browser per rerun
+PAGE_SIZE = 50
+
+def paginated_dataframe(df, name):
+    """Render a table in PAGE_SIZE windows; small tables render directly"""
+    if len(df) <= PAGE_SIZE:
+        st.dataframe(df, use_container_width=True)
+        return
+    last_page = (len(df) - 1) // PAGE_SIZE
+    page = st.number_input(
+        f"{name} page", min_value=0, max_value=last_page, value=0,
+        key=f"{name}_page", help=f"{len(df)} rows, {PAGE_SIZE} per page"
+    )
+    st.dataframe(df.iloc[page * PAGE_SIZE:(page + 1) * PAGE_SIZE], use_container_width=True)
+
+def record_recent_booking(booking):
+    """Push a booking dict onto the Dashboard's fixed-size ring buffer"""
+    recent = st.session_state.setdefault('recent_bookings', collections.deque(maxlen=5))
+    recent.append(booking)
+
+def index_by_id(df):
+    """Key a frame by its id column (kept as a column too) for O(1) .at access"""
+    if 'id' in df.columns:
+        return df.set_index('id', drop=False).rename_axis(None)
+    return df
+
+def next_id(table):
+    """Monotonic per-table id counter, seeded from the loaded frame.
+
+    Keeps ids unique even after deletions, unlike the old len(df)+1, and
+    avoids re-scanning the id column on every insert.
+    """
+    counters = st.session_state.setdefault('id_counters', {})
+    if table not in counters:
+        df = st.session_state.get(table)
+        counters[table] = 0 if df is None or df.empty else int(df['id'].max())
+    counters[table] += 1
+    return counters[table]
+
+def car_options(cars_df):
+    """Parallel (ids, labels) lists for the car pickers.
+
+    Labels come from one vectorized string concat; ids let the forms resolve
+    a selection without an iloc row materialization. Cached in session_state
+    keyed on row count; the car edit form drops the cache so renamed cars
+    pick up fresh labels.
+    """
+    cached = st.session_state.get('car_options_cache')
+    if cached is not None and cached[0] == len(cars_df):
+        return cached[1], cached[2]
+    ids = cars_df['id'].tolist()
+    labels = (cars_df['car_name'].astype(str) + ' (' + cars_df['plate_number'].astype(str) + ')').tolist()
+    st.session_state.car_options_cache = (len(cars_df), ids, labels)
+    return ids, labels
+
+def append_rows(df, rows, data_type=None):
+    """Append a batch of row dicts with a single concat.
+
+    Submit handlers collect their new rows as plain dicts and materialize
+    them here in one go, instead of building a throwaway single-row
+    DataFrame per insert. Passing data_type re-applies the declared schema
+    so the frame's dtypes don't drift between saves.
+    """
+    combined = pd.concat([df, pd.DataFrame(rows)], ignore_index=True)
+    if data_type:
+        combined = apply_table_schema(combined, data_type)
+    return combined
+
+def fast_sum(series):
+    """Sum a numeric column, routing big frames through a compiled kernel.
+
+    Below the threshold the pandas kernel wins; above it a numba-jitted
+    reduction (or numexpr's multithreaded evaluator) skips the block
+    manager overhead. Both dependencies are optional.
+    """
+    if len(series) > 50000:
+        if _njit_sum is not None:
+            return int(_njit_sum(series.to_numpy()))
+        if ne is not None:
+            return int(ne.evaluate('sum(x)', local_dict={'x': series.to_numpy()}))
+    return int(series.sum())
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: id})
+def _dashboard_totals(user_prefix, n_bookings, n_expenses, bookings_sig, expenses_sig, bookings_df, expenses_df):
+    """Sum income/expenses once per data change; repeat reruns hit the cache.
+
+    Keyed on cheap fingerprints (row count + last id) so the frames themselves
+    are never hashed. Submit handlers call _dashboard_totals.clear() after
+    in-place edits that don't change the fingerprint.
+    """
+    # Frames always carry typed amount columns (empty_table/apply_table_schema),
+    # so these are single vectorized sums with no guards
+    return fast_sum(bookings_df["amount_paid"]), fast_sum(expenses_df["amount"])
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: id})
+def _dashboard_charts(user_prefix, n_bookings, n_expenses, n_cars, bookings_sig, expenses_sig, bookings_df, expenses_df, cars_df):
+    """Pre-aggregate the three Dashboard chart inputs once per data change.
+
+    Same fingerprint-keyed scheme as _dashboard_totals; cleared alongside it
+    (and on status changes) so merely switching menus skips the groupbys.
+    """
+    monthly_income = None
+    if not bookings_df.empty:
+        # Group on an integer year*12+month key (pandas' fast int64 group
+        # path) and format the handful of group labels afterwards, instead
+        # of materializing a Period-string key per row
+        dates = pd.to_datetime(bookings_df['start_date'], format="%Y-%m-%d", errors='coerce')
+        month_key = (dates.dt.year * 12 + dates.dt.month).rename('month')
+        monthly_income = bookings_df.groupby(month_key)['amount_paid'].sum().reset_index()
+        monthly_income['month'] = [
+            f"{int(k - 1) // 12:04d}-{int(k - 1) % 12 + 1:02d}"
+            for k in monthly_income['month']
+        ]
+    expense_by_type = None
+    if not expenses_df.empty:
+        expense_by_type = expenses_df.groupby('type')['amount'].sum().reset_index()
+    status_counts = None
+    if not cars_df.empty:
+        status_counts = cars_df['status'].value_counts()
+    return monthly_income, expense_by_type, status_counts
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: id})
+def _expense_pie(user_prefix, n_expenses, expenses_sig, expense_by_type):
+    """Build the pie once per data change and cache its dict form.
+
+    Figure dicts pickle cleanly where Figure objects don't always hash;
+    the render site rehydrates with go.Figure, which is cheap next to
+    px.pie's constructor.
+    """
+    fig = px.pie(expense_by_type, values='amount', names='type',
+                 title="Expenses by Type")
+    fig.update_layout(height=300)
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: id})
+def _bookings_with_car_names(user_prefix, n_bookings, n_cars, bookings_sig, cars_sig, bookings_df, cars_df):
+    """Join car names onto bookings for display, once per data change.
+
+    Fingerprint-keyed like _dashboard_totals; edits that change values
+    without growing either table clear this alongside the chart caches.
+    """
+    if bookings_df.empty:
+        return bookings_df
+    return bookings_df.merge(
+        cars_df[['id', 'car_name']],
+        left_on='car_id',
+        right_on='id',
+        suffixes=('', '_car')
+    ).drop('id_car', axis=1)
 
 def update_car_status(car_id, new_status, user_prefix):
     """Update car status without affecting other data"""
-    cars = st.session_state.cars.copy()
-    cars.loc[cars["id"] == car_id, "status"] = new_status
-    st.session_state.cars = cars
+    cars = st.session_state.cars
+    if car_id in cars.index:
+        cars.at[car_id, "status"] = new_status
+    else:
+        # Frame not keyed by id (e.g. legacy import) — fall back to the mask
+        cars.loc[cars["id"] == car_id, "status"] = new_status
+    sets = st.session_state.get('available_car_ids')
+    if sets is not None and user_prefix in sets:
+        if new_status == "Available":
+            sets[user_prefix].add(car_id)
+        else:
+            sets[user_prefix].discard(car_id)
+    _dashboard_charts.clear()
+    _expense_pie.clear()
+    _build_export.clear()
     save_data(cars, "cars.csv", user_prefix)
 
 def check_date_overlap(car_id, start_date, end_date, exclude_booking_id=None):
-    """Check if booking dates overlap with existing bookings for the same car"""
+    """Check if booking dates overlap with existing bookings for the same car.
+
+    The forms re-run this on every rerun even when only an unrelated field
+    changed, so the last (args -> result) pair is memoized in the session;
+    save_data drops the memo whenever bookings are written.
+    """
+    key = (car_id, start_date, end_date, exclude_booking_id)
+    if st.session_state.get('_last_conflict_key') == key:
+        return st.session_state['_last_conflict_result']
+    result = _compute_date_overlap(car_id, start_date, end_date, exclude_booking_id)
+    st.session_state['_last_conflict_key'] = key
+    st.session_state['_last_conflict_result'] = result
+    return result
+
+def _compute_date_overlap(car_id, start_date, end_date, exclude_booking_id=None):
     bookings = st.session_state.bookings
-    car_bookings = bookings[bookings["car_id"] == car_id]
+    if bookings.empty:
+        return False, []
     
-    # Exclude current booking if editing
+    # One fused mask instead of three chained filters, so no intermediate
+    # frame is materialized for the car/exclude/status narrowing
+    active_mask = (bookings["car_id"] == car_id) & (bookings["status"] == "Booked")
     if exclude_booking_id:
-        car_bookings = car_bookings[car_bookings["id"] != exclude_booking_id]
-    
-    # Only check active bookings (not completed or cancelled)
-    active_bookings = car_bookings[car_bookings["status"] == "Booked"]
-    
-    if active_bookings.empty:
+        active_mask &= bookings["id"] != exclude_booking_id
+    if not active_mask.any():
         return False, []
+    active_bookings = bookings.loc[active_mask]
     
     start_date = pd.to_datetime(start_date)
     end_date = pd.to_datetime(end_date)
     
-    overlapping_bookings = []
-    
-    for _, booking in active_bookings.iterrows():
-        booking_start = pd.to_datetime(booking['start_date'])
-        booking_end = pd.to_datetime(booking['end_date'])
-        
-        # Check for overlap
-        if (start_date <= booking_end) and (end_date >= booking_start):
-            overlapping_bookings.append({
-                'client': booking['client_name'],
-                'start': booking['start_date'],
-                'end': booking['end_date']
-            })
+    # Columns hold date objects since the schema change, so these are cheap
+    # object-to-timestamp conversions; the overlap test is one boolean mask
+    booking_starts = pd.to_datetime(active_bookings['start_date'], errors='coerce')
+    booking_ends = pd.to_datetime(active_bookings['end_date'], errors='coerce')
+    mask = ((start_date <= booking_ends) & (end_date >= booking_starts)).to_numpy()
+    if not mask.any():
+        return False, []
     
-    return len(overlapping_bookings) > 0, overlapping_bookings
+    overlapping_bookings = (
+        active_bookings.loc[mask, ['client_name', 'start_date', 'end_date']]
+        .rename(columns={'client_name': 'client', 'start_date': 'start', 'end_date': 'end'})
+        .to_dict('records')
+    )
+    return True, overlapping_bookings
 
 def get_car_availability_status(car_id):
     """Get detailed availability status for a car"""
@@ -222,33 +870,33 @@ def get_car_availability_status(car_id):
         return "Available", []
     
     current_date = pd.to_datetime(dt.date.today())
-    active_bookings = []
-    
-    for _, booking in car_bookings.iterrows():
-        booking_start = pd.to_datetime(booking['start_date'])
-        booking_end = pd.to_datetime(booking['end_date'])
-        
-        if booking_end >= current_date:  # Future or ongoing bookings
-            active_bookings.append({
-                'client': booking['client_name'],
-                'start': booking['start_date'],
-                'end': booking['end_date']
-            })
-    
-    if active_bookings:
-        return "Partially Booked", active_bookings
-    else:
+    booking_ends = pd.to_datetime(car_bookings['end_date'], errors='coerce')
+    # Future or ongoing bookings, selected with one mask
+    mask = (booking_ends >= current_date).to_numpy()
+    if not mask.any():
         return "Available", []
+    
+    active_bookings = (
+        car_bookings.loc[mask, ['client_name', 'start_date', 'end_date']]
+        .rename(columns={'client_name': 'client', 'start_date': 'start', 'end_date': 'end'})
+        .to_dict('records')
+    )
+    return "Partially Booked", active_bookings
 
 def complete_booking(booking_id, user_prefix):
     """Mark booking as completed and update car status if no other active bookings"""
-    bookings = st.session_state.bookings.copy()
-    booking_row = bookings[bookings["id"] == booking_id]
-    if not booking_row.empty:
-        car_id = booking_row.iloc[0]["car_id"]
-        bookings.loc[bookings["id"] == booking_id, "status"] = "Completed"
-        st.session_state.bookings = bookings
+    bookings = st.session_state.bookings
+    if booking_id in bookings.index:
+        car_id = bookings.at[booking_id, "car_id"]
+        bookings.at[booking_id, "status"] = "Completed"
         save_data(bookings, "bookings.csv", user_prefix)
+        # In-place status flip leaves the fingerprint unchanged, so the
+        # display caches must be dropped explicitly like the edit forms do
+        _dashboard_totals.clear()
+        _dashboard_charts.clear()
+        _expense_pie.clear()
+        _bookings_with_car_names.clear()
+        _build_export.clear()
         
         # Check if car has other active bookings
         other_active_bookings = bookings[
@@ -306,29 +954,419 @@ def show_login():
                     else:
                         st.error(message)
 
+# ---------- Enhanced Dashboard ----------
+@st.fragment
+def dashboard_view(user_prefix):
+    """Dashboard fragment: reruns independently of the rest of the page.
+
+    Widget clicks inside the Dashboard (approvals, quick actions) rerun
+    only this function instead of the whole script.
+    """
+    cars = get_table('cars')
+    bookings = get_table('bookings')
+    expenses = get_table('expenses')
+    st.markdown("# 📊 Business Dashboard")
+    
+    # Load pending bookings for current user (owner filter memoized)
+    pending_bookings, user_pending = user_pending_bookings(user_prefix)
+    
+    # Debug info (remove in production); fragments can't write to the
+    # sidebar, so this lives in an expander within the fragment body
+    with st.expander("🔍 Debug Info"):
+        st.write(f"Total pending bookings: {len(pending_bookings)}")
+        st.write(f"User pending bookings: {len(user_pending)}")
+        st.write(f"Current user: {user_prefix}")
+        if pending_bookings:
+            st.write("Sample booking owners:", [b.get('owner', 'No owner') for b in list(pending_bookings.values())[:3]])
+            st.write("All pending bookings:", list(pending_bookings.values()))
+    
+    # Prominent pending bookings notification at top
+    if user_pending:
+        st.markdown(f"""
+        <div style="
+            background: linear-gradient(135deg, #ff6b6b, #ee5a52);
+            color: white;
+            padding: 20px;
+            border-radius: 15px;
+            margin: 20px 0;
+            text-align: center;
+            font-size: 18px;
+            font-weight: bold;
+            box-shadow: 0 4px 20px rgba(255, 107, 107, 0.3);
+            border-left: 5px solid #fff;
+        ">
+            🔔 URGENT: You have {len(user_pending)} pending booking request{"s" if len(user_pending) > 1 else ""} waiting for your attention!
+        </div>
+        """, unsafe_allow_html=True)
+        
+        with st.expander("📋 Pending Booking Requests", expanded=True):
+            for booking in user_pending:
+                # Show time since submission
+                try:
+                    submission_time = pd.to_datetime(booking.get('submission_date', ''))
+                    time_diff = dt.datetime.now() - submission_time
+                    hours_ago = int(time_diff.total_seconds() / 3600)
+                    if hours_ago < 1:
+                        minutes_ago = int(time_diff.total_seconds() / 60)
+                        submitted = f"Submitted {minutes_ago} minutes ago"
+                    else:
+                        submitted = f"Submitted {hours_ago} hours ago"
+                except:
+                    submitted = "Recently submitted"
+                
+                # One HTML card per booking instead of ~7 separate elements;
+                # only the action buttons stay as real widgets
+                details = [
+                    f"📅 {booking['start_date']} to {booking['end_date']}",
+                    f"📞 {booking['client_phone']}",
+                ]
+                if booking.get('client_email'):
+                    details.append(f"📧 {booking['client_email']}")
+                if booking.get('purpose'):
+                    details.append(f"📝 Purpose: {booking['purpose']}")
+                st.markdown(f"""
+                <div style="
+                    background: rgba(255, 107, 107, 0.1);
+                    padding: 15px;
+                    border-radius: 10px;
+                    margin: 10px 0;
+                    border-left: 4px solid #ff6b6b;
+                ">
+                    <b>{booking['client_name']}</b> - {booking.get('car_name', 'Unknown Car')}<br>
+                    {'<br>'.join(details)}<br>
+                    <small style="opacity: 0.7;">⏰ {submitted}</small>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                col2, col3, col4 = st.columns(3)
+                
+                with col2:
+                    if st.button("✅ Approve", key=f"approve_{booking['id']}"):
+                        # Create confirmed booking
+                        new_booking_id = next_id('bookings')
+                        new_booking = {
+                            "id": new_booking_id,
+                            "car_id": booking['car_id'],
+                            "client_name": booking['client_name'],
+                            "start_date": booking['start_date'],
+                            "end_date": booking['end_date'],
+                            "amount_paid": 0,  # Can be updated later
+                            "status": "Confirmed"
+                        }
+                        
+                        # Add to bookings
+                        st.session_state.bookings = index_by_id(append_rows(bookings, [new_booking], 'bookings'))
+                        record_recent_booking(new_booking)
+                        
+                        # Update car status
+                        update_car_status(booking['car_id'], "Booked", user_prefix)
+                        
+                        # Save bookings
+                        save_new_row(st.session_state.bookings, new_booking, "bookings.csv", user_prefix)
+                        
+                        # Update pending booking status
+                        pending = st.session_state.pending_bookings.get(booking['id'])
+                        if pending is not None:
+                            pending['status'] = 'Approved'
+                        _journal_pending_update(booking['id'], 'Approved')
+                        
+                        _persist_pending()
+                        
+                        st.success("✅ Booking approved and added to your system!")
+                        st.rerun()
+                
+                with col3:
+                    if st.button("✏️ Edit", key=f"edit_{booking['id']}"):
+                        st.session_state[f"edit_booking_{booking['id']}"] = True
+                        st.rerun()
+                
+                with col4:
+                    if st.button("❌ Reject", key=f"reject_{booking['id']}"):
+                        # Update pending booking status
+                        pending = st.session_state.pending_bookings.get(booking['id'])
+                        if pending is not None:
+                            pending['status'] = 'Rejected'
+                        _journal_pending_update(booking['id'], 'Rejected')
+                        
+                        _persist_pending()
+                        
+                        st.success("❌ Booking rejected!")
+                        st.rerun()
+                
+                # Edit form for pending booking
+                if st.session_state.get(f"edit_booking_{booking['id']}", False):
+                    with st.form(f"edit_pending_{booking['id']}"):
+                        st.markdown("##### Edit Booking Request")
+                        col_a, col_b = st.columns(2)
+                        with col_a:
+                            new_client_name = st.text_input("Client Name", value=booking['client_name'])
+                            new_start = st.date_input("Start Date", value=pd.to_datetime(booking['start_date']).date())
+                            estimated_amount = st.number_input("Estimated Amount (UGX)", min_value=0)
+                        with col_b:
+                            new_phone = st.text_input("Phone", value=booking['client_phone'])
+                            new_end = st.date_input("End Date", value=pd.to_datetime(booking['end_date']).date())
+                        
+                        col_x, col_y = st.columns(2)
+                        with col_x:
+                            if st.form_submit_button("💾 Save & Approve"):
+                                # Create booking with edited details
+                                new_booking_id = next_id('bookings')
+                                new_booking = {
+                                    "id": new_booking_id,
+                                    "car_id": booking['car_id'],
+                                    "client_name": new_client_name,
+                                    "start_date": new_start.isoformat(),
+                                    "end_date": new_end.isoformat(),
+                                    "amount_paid": estimated_amount,
+                                    "status": "Confirmed"
+                                }
+                                
+                                # Add to bookings
+                                st.session_state.bookings = index_by_id(append_rows(bookings, [new_booking], 'bookings'))
+                                record_recent_booking(new_booking)
+                                
+                                # Update car status and save
+                                update_car_status(booking['car_id'], "Booked", user_prefix)
+                                save_new_row(st.session_state.bookings, new_booking, "bookings.csv", user_prefix)
+                                
+                                # Update pending booking
+                                pending = st.session_state.pending_bookings.get(booking['id'])
+                                if pending is not None:
+                                    pending['status'] = 'Approved'
+                                _journal_pending_update(booking['id'], 'Approved')
+
+                                _persist_pending()
+                                
+                                del st.session_state[f"edit_booking_{booking['id']}"]
+                                st.success("✅ Booking edited and approved!")
+                                st.rerun()
+                        
+                        with col_y:
+                            if st.form_submit_button("❌ Cancel Edit"):
+                                del st.session_state[f"edit_booking_{booking['id']}"]
+                                st.rerun()
+                
+                st.divider()
+
+    # Key Metrics Section - Always show regardless of pending bookings
+    st.markdown("---")
+    
+    # Key Metrics
+    bookings_sig = int(bookings['id'].max()) if not bookings.empty else 0
+    expenses_sig = int(expenses['id'].max()) if not expenses.empty else 0
+    total_income, total_expenses = _dashboard_totals(
+        user_prefix, len(bookings), len(expenses), bookings_sig, expenses_sig,
+        bookings, expenses
+    )
+
+    profit = total_income - total_expenses
+    
+    # Metrics Row
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("💰 Total Income", f"UGX {total_income:,.0f}")
+    with col2:
+        st.metric("🧾 Total Expenses", f"UGX {total_expenses:,.0f}")
+    with col3:
+        st.metric("📊 Net Profit", f"UGX {profit:,.0f}", delta=f"{((profit/total_income)*100) if total_income > 0 else 0:.1f}%")
+    with col4:
+        st.metric("🚗 Total Cars", len(cars))
+
+    # Charts Row — aggregates come precomputed from the fingerprint cache
+    monthly_income, expense_by_type, status_counts = _dashboard_charts(
+        user_prefix, len(bookings), len(expenses), len(cars), bookings_sig,
+        expenses_sig, bookings, expenses, cars
+    )
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("### 📈 Monthly Income Trend")
+        if monthly_income is not None:
+            # Arrow-backed built-in chart: far less serialized per rerun
+            # than a full Plotly figure spec
+            st.line_chart(monthly_income.set_index('month')['amount_paid'], height=300)
+        else:
+            st.info("No booking data available")
+
+    with col2:
+        st.markdown("### 🥧 Expense Breakdown")
+        if expense_by_type is not None:
+            st.plotly_chart(go.Figure(_expense_pie(user_prefix, len(expenses), expenses_sig, expense_by_type)),
+                            use_container_width=True)
+        else:
+            st.info("No expense data available")
+
+    # Status Overview with Quick Actions
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("### 🚗 Car Status Overview")
+        if status_counts is not None:
+            st.bar_chart(status_counts, height=300)
+        else:
+            st.info("No cars registered")
+
+    with col2:
+        st.markdown("### ⚡ Quick Actions")
+        active_mask = (bookings['status'] == 'Booked').to_numpy() if not bookings.empty else None
+        
+        if active_mask is not None and active_mask.any():
+            st.markdown("**Complete Bookings:**")
+            # Project just the three columns the loop reads through the
+            # mask instead of materializing a filtered frame
+            for client, start, bid in zip(bookings['client_name'].to_numpy()[active_mask],
+                                          bookings['start_date'].to_numpy()[active_mask],
+                                          bookings['id'].to_numpy()[active_mask]):
+                col_a, col_b = st.columns([3, 1])
+                with col_a:
+                    st.write(f"📅 {client} - {start}")
+                with col_b:
+                    if st.button("✅", key=f"complete_{bid}", help="Complete booking"):
+                        if complete_booking(bid, user_prefix):
+                            st.success("Booking completed!")
+                            st.rerun()
+        else:
+            st.info("No active bookings")
+
+    # Recent bookings come straight from the ring buffer maintained on
+    # insert — no per-render slice of the full frame
+    recent = st.session_state.get('recent_bookings')
+    if recent:
+        st.markdown("### 🕒 Recent Bookings")
+        st.dataframe(pd.DataFrame(list(recent)), use_container_width=True)
+    
+    # Show message about pending bookings if none exist
+    if not user_pending:
+        if len(pending_bookings) > 0:
+            st.info(f"ℹ️ No pending booking requests for you. Total system bookings: {len(pending_bookings)}")
+        else:
+            st.info("ℹ️ No pending booking requests. Share your booking link to receive requests!")
+
+
+@st.fragment
+def _edit_booking_section(user_prefix):
+    """Edit-booking picker and form, scoped like dashboard_view.
+
+    Switching the selected booking reruns only this fragment instead of
+    re-rendering the bookings table and add form around it.
+    """
+    bookings = get_table('bookings')
+    st.markdown("### Edit Booking")
+    # One vectorized pass builds the labels; the format_func is a dict lookup
+    booking_label_map = dict(zip(
+        bookings['id'],
+        bookings['client_name'].astype(str) + ' - ' + bookings['start_date'].astype(str)
+    ))
+    selected_booking_id = st.selectbox("Select Booking to Edit", 
+                                     bookings['id'].values,
+                                     format_func=booking_label_map.get)
+        
+    if selected_booking_id:
+        booking_data = bookings.loc[selected_booking_id]
+            
+        with st.form("edit_booking"):
+            col1, col2 = st.columns(2)
+            with col1:
+                new_client = st.text_input("Client Name", value=booking_data['client_name'])
+                new_start = st.date_input("Start Date", value=pd.to_datetime(booking_data['start_date']).date())
+                new_amount = st.number_input("Amount", value=float(booking_data['amount_paid']))
+            with col2:
+                new_end = st.date_input("End Date", value=pd.to_datetime(booking_data['end_date']).date())
+                new_status = st.selectbox("Status", BOOKING_STATUSES, 
+                                        index=BOOKING_STATUSES.index(booking_data['status']))
+                
+            # Check for date conflicts when editing
+            if new_start and new_end:
+                has_conflict, conflicts = check_date_overlap(booking_data['car_id'], new_start, new_end, selected_booking_id)
+                if has_conflict:
+                    st.warning("⚠️ Date conflict detected with existing bookings:")
+                    for conflict in conflicts:
+                        st.write(f"• {conflict['client']} ({conflict['start']} to {conflict['end']})")
+                
+            if st.form_submit_button("💾 Update Booking"):
+                if new_client and new_amount > 0 and new_start and new_end:
+                    # Check conflicts again before saving
+                    has_conflict, conflicts = check_date_overlap(booking_data['car_id'], new_start, new_end, selected_booking_id)
+                        
+                    if has_conflict and new_status == "Booked":
+                        st.error("Cannot update booking due to date conflicts with existing bookings.")
+                    else:
+                        # Bookings are keyed by id, so one indexed write updates all fields
+                        st.session_state.bookings.loc[selected_booking_id, ['client_name', 'start_date', 'end_date', 'amount_paid', 'status']] = \
+                            [new_client, new_start.isoformat(), new_end.isoformat(), new_amount, new_status]
+                        save_data(st.session_state.bookings, "bookings.csv", user_prefix)
+                        _dashboard_totals.clear()
+                        _dashboard_charts.clear()
+                        _expense_pie.clear()
+                        _bookings_with_car_names.clear()
+                        _build_export.clear()
+                        st.success("Booking updated successfully!")
+                        st.rerun()
+                else:
+                    st.error("Please fill in all fields correctly.")
+
+@st.fragment
+def _edit_expense_section(user_prefix):
+    """Edit-expense picker and form, scoped like dashboard_view"""
+    expenses = get_table('expenses')
+    st.markdown("### Edit Expense")
+    # One vectorized pass builds the labels; the format_func is a dict lookup
+    expense_label_map = dict(zip(
+        expenses['id'],
+        expenses['description'].astype(str) + ' - UGX ' + expenses['amount'].astype(str)
+    ))
+    selected_expense_id = st.selectbox("Select Expense to Edit", 
+                                     expenses['id'].values,
+                                     format_func=expense_label_map.get)
+        
+    if selected_expense_id:
+        expense_data = expenses.loc[selected_expense_id]
+            
+        with st.form("edit_expense"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                new_desc = st.text_input("Description", value=expense_data['description'])
+            with col2:
+                new_amount = st.number_input("Amount", value=float(expense_data['amount']))
+            with col3:
+                new_type = st.selectbox("Type", EXPENSE_TYPES,
+                                       index=EXPENSE_TYPES.index(expense_data['type']))
+                
+            if st.form_submit_button("💾 Update Expense"):
+                if new_desc and new_amount > 0:
+                    # Expenses are keyed by id, so one indexed write updates all fields
+                    st.session_state.expenses.loc[selected_expense_id, ['description', 'amount', 'type']] = \
+                        [new_desc, new_amount, new_type]
+                    save_data(st.session_state.expenses, "expenses.csv", user_prefix)
+                    _dashboard_totals.clear()
+                    _dashboard_charts.clear()
+                    _expense_pie.clear()
+                    _build_export.clear()
+                    st.success("Expense updated successfully!")
+                    st.rerun()
+
 # ---------- Main App with Enhanced Data Persistence ----------
 def main_app():
+    # Flush tables dirtied by the previous rerun's mutations; the submit
+    # handlers call st.rerun() right after saving, so this runs immediately
+    flush_dirty_tables()
+
     # Initialize user-specific data with persistent storage priority
     user_prefix = st.session_state.username
     
     # Always reload data to ensure persistence works
     if 'current_user' not in st.session_state or st.session_state.get('current_user') != user_prefix:
-        # Clear any cached data first
-        st.cache_data.clear()
-        
-        # Load user-specific data
-        st.session_state.cars = load_data("cars.csv", ["id", "car_name", "plate_number", "model", "status", "last_service_date", "next_service_date"], user_prefix)
-        st.session_state.bookings = load_data("bookings.csv", ["id", "car_id", "client_name", "start_date", "end_date", "amount_paid", "status"], user_prefix)
-        st.session_state.expenses = load_data("expenses.csv", ["id", "car_id", "date", "description", "amount", "type"], user_prefix)
+        # Evict the previous user's tables; get_table reloads on demand.
+        # No cache_data.clear() here — every cached reader is keyed by
+        # user-specific paths or frame signatures, so other users' warm
+        # entries survive the switch
         st.session_state.current_user = user_prefix
+        for stale_key in ('cars', 'bookings', 'expenses', 'recent_bookings',
+                          'id_counters', 'available_car_ids', 'car_options_cache'):
+            st.session_state.pop(stale_key, None)
 
-    cars = st.session_state.cars
-    bookings = st.session_state.bookings
-    expenses = st.session_state.expenses
-
-    # Load pending bookings FIRST - before sidebar
-    pending_bookings = load_pending_bookings()
-    user_pending = [b for b in pending_bookings if b.get('owner') == user_prefix and b.get('status') == 'Pending']
+    # Load pending bookings FIRST - before sidebar (owner filter memoized)
+    pending_bookings, user_pending = user_pending_bookings(user_prefix)
 
     # ---------- Enhanced Sidebar ----------
     with st.sidebar:
@@ -347,7 +1385,7 @@ def main_app():
         # Show raw pending bookings data
         if pending_bookings:
             st.write("**All Pending Bookings:**")
-            for i, booking in enumerate(pending_bookings):
+            for i, booking in enumerate(pending_bookings.values()):
                 owner = booking.get('owner', 'NO OWNER')
                 status = booking.get('status', 'NO STATUS') 
                 client = booking.get('client_name', 'NO CLIENT')
@@ -385,22 +1423,6 @@ def main_app():
             ">
                 🔔 {len(user_pending)} NEW BOOKING REQUEST{"S" if len(user_pending) > 1 else ""}!
             </div>
-            <style>
-            @keyframes pulse-notification {{
-                0% {{ 
-                    box-shadow: 0 4px 15px rgba(255, 107, 107, 0.4);
-                    transform: scale(1);
-                }}
-                50% {{ 
-                    box-shadow: 0 6px 25px rgba(255, 107, 107, 0.7);
-                    transform: scale(1.02);
-                }}
-                100% {{ 
-                    box-shadow: 0 4px 15px rgba(255, 107, 107, 0.4);
-                    transform: scale(1);
-                }}
-            }}
-            </style>
             """, unsafe_allow_html=True)
             
             # Make the button more prominent
@@ -435,9 +1457,9 @@ def main_app():
         # Show data summary with pending bookings
         st.markdown("---")
         st.markdown("### 📈 Your Data Summary")
-        st.write(f"🚗 Cars: {len(cars)}")
-        st.write(f"📅 Bookings: {len(bookings)}")
-        st.write(f"💰 Expenses: {len(expenses)}")
+        st.write(f"🚗 Cars: {table_row_count('cars')}")
+        st.write(f"📅 Bookings: {table_row_count('bookings')}")
+        st.write(f"💰 Expenses: {table_row_count('expenses')}")
         if user_pending:
             st.write(f"🔥 **URGENT: {len(user_pending)} Pending Requests**")
         
@@ -484,7 +1506,8 @@ def main_app():
         
         # ---------- Logout ----------
         if st.button("🚪 Logout"):
-            # Clear user session but keep persistent data
+            # Flush pending writes, then clear user session but keep persistent data
+            flush_dirty_tables(force=True)
             keys_to_remove = ['logged_in', 'username', 'full_name', 'current_user', 'cars', 'bookings', 'expenses']
             for key in keys_to_remove:
                 if key in st.session_state:
@@ -522,293 +1545,17 @@ def main_app():
             ">
                 {len(user_pending)}
             </div>
-            <style>
-            @keyframes bounce-badge {{
-                0%, 20%, 50%, 80%, 100% {{ transform: translateY(0); }}
-                40% {{ transform: translateY(-5px); }}
-                60% {{ transform: translateY(-2px); }}
-            }}
-            </style>
             """, unsafe_allow_html=True)
         
         # Add data management section
         show_data_management_section()
 
-    # ---------- Enhanced Dashboard ----------
     if menu == "📊 Dashboard":
-        st.markdown("# 📊 Business Dashboard")
-        
-        # Load pending bookings for current user
-        pending_bookings = load_pending_bookings()
-        user_pending = [b for b in pending_bookings if b.get('owner') == user_prefix and b.get('status') == 'Pending']
-        
-        # Debug info (remove in production)
-        if st.sidebar.checkbox("🔍 Debug Info"):
-            st.sidebar.write(f"Total pending bookings: {len(pending_bookings)}")
-            st.sidebar.write(f"User pending bookings: {len(user_pending)}")
-            st.sidebar.write(f"Current user: {user_prefix}")
-            if pending_bookings:
-                st.sidebar.write("Sample booking owners:", [b.get('owner', 'No owner') for b in pending_bookings[:3]])
-                st.sidebar.write("All pending bookings:", pending_bookings)
-        
-        # Prominent pending bookings notification at top
-        if user_pending:
-            st.markdown(f"""
-            <div style="
-                background: linear-gradient(135deg, #ff6b6b, #ee5a52);
-                color: white;
-                padding: 20px;
-                border-radius: 15px;
-                margin: 20px 0;
-                text-align: center;
-                font-size: 18px;
-                font-weight: bold;
-                box-shadow: 0 4px 20px rgba(255, 107, 107, 0.3);
-                border-left: 5px solid #fff;
-            ">
-                🔔 URGENT: You have {len(user_pending)} pending booking request{"s" if len(user_pending) > 1 else ""} waiting for your attention!
-            </div>
-            """, unsafe_allow_html=True)
-            
-            with st.expander("📋 Pending Booking Requests", expanded=True):
-                for booking in user_pending:
-                    # Add visual emphasis for each pending booking
-                    st.markdown(f"""
-                    <div style="
-                        background: rgba(255, 107, 107, 0.1);
-                        padding: 15px;
-                        border-radius: 10px;
-                        margin: 10px 0;
-                        border-left: 4px solid #ff6b6b;
-                    ">
-                    """, unsafe_allow_html=True)
-                    
-                    col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-                    
-                    with col1:
-                        st.write(f"**{booking['client_name']}** - {booking.get('car_name', 'Unknown Car')}")
-                        st.write(f"📅 {booking['start_date']} to {booking['end_date']}")
-                        st.write(f"📞 {booking['client_phone']}")
-                        if booking.get('client_email'):
-                            st.write(f"📧 {booking['client_email']}")
-                        if booking.get('purpose'):
-                            st.write(f"📝 Purpose: {booking['purpose']}")
-                        
-                        # Show time since submission
-                        try:
-                            submission_time = pd.to_datetime(booking.get('submission_date', ''))
-                            time_diff = dt.datetime.now() - submission_time
-                            hours_ago = int(time_diff.total_seconds() / 3600)
-                            if hours_ago < 1:
-                                minutes_ago = int(time_diff.total_seconds() / 60)
-                                st.caption(f"⏰ Submitted {minutes_ago} minutes ago")
-                            else:
-                                st.caption(f"⏰ Submitted {hours_ago} hours ago")
-                        except:
-                            st.caption("⏰ Recently submitted")
-                    
-                    with col2:
-                        if st.button("✅ Approve", key=f"approve_{booking['id']}"):
-                            # Create confirmed booking
-                            new_booking_id = 1 if bookings.empty else int(bookings['id'].max()) + 1
-                            new_booking = {
-                                "id": new_booking_id,
-                                "car_id": booking['car_id'],
-                                "client_name": booking['client_name'],
-                                "start_date": booking['start_date'],
-                                "end_date": booking['end_date'],
-                                "amount_paid": 0,  # Can be updated later
-                                "status": "Confirmed"
-                            }
-                            
-                            # Add to bookings
-                            st.session_state.bookings = pd.concat([bookings, pd.DataFrame([new_booking])], ignore_index=True)
-                            
-                            # Update car status
-                            update_car_status(booking['car_id'], "Booked", user_prefix)
-                            
-                            # Save bookings
-                            save_data(st.session_state.bookings, "bookings.csv", user_prefix)
-                            
-                            # Update pending booking status
-                            for i, pb in enumerate(st.session_state.pending_bookings):
-                                if pb['id'] == booking['id']:
-                                    st.session_state.pending_bookings[i]['status'] = 'Approved'
-                            
-                            # Save updated pending bookings
-                            st.session_state.persistent_data['pending_bookings']['pending_bookings'] = st.session_state.pending_bookings
-                            
-                            st.success("✅ Booking approved and added to your system!")
-                            st.rerun()
-                    
-                    with col3:
-                        if st.button("✏️ Edit", key=f"edit_{booking['id']}"):
-                            st.session_state[f"edit_booking_{booking['id']}"] = True
-                            st.rerun()
-                    
-                    with col4:
-                        if st.button("❌ Reject", key=f"reject_{booking['id']}"):
-                            # Update pending booking status
-                            for i, pb in enumerate(st.session_state.pending_bookings):
-                                if pb['id'] == booking['id']:
-                                    st.session_state.pending_bookings[i]['status'] = 'Rejected'
-                            
-                            # Save updated pending bookings
-                            st.session_state.persistent_data['pending_bookings']['pending_bookings'] = st.session_state.pending_bookings
-                            
-                            st.success("❌ Booking rejected!")
-                            st.rerun()
-                    
-                    # Edit form for pending booking
-                    if st.session_state.get(f"edit_booking_{booking['id']}", False):
-                        with st.form(f"edit_pending_{booking['id']}"):
-                            st.markdown("##### Edit Booking Request")
-                            col_a, col_b = st.columns(2)
-                            with col_a:
-                                new_client_name = st.text_input("Client Name", value=booking['client_name'])
-                                new_start = st.date_input("Start Date", value=pd.to_datetime(booking['start_date']).date())
-                                estimated_amount = st.number_input("Estimated Amount (UGX)", min_value=0)
-                            with col_b:
-                                new_phone = st.text_input("Phone", value=booking['client_phone'])
-                                new_end = st.date_input("End Date", value=pd.to_datetime(booking['end_date']).date())
-                            
-                            col_x, col_y = st.columns(2)
-                            with col_x:
-                                if st.form_submit_button("💾 Save & Approve"):
-                                    # Create booking with edited details
-                                    new_booking_id = 1 if bookings.empty else int(bookings['id'].max()) + 1
-                                    new_booking = {
-                                        "id": new_booking_id,
-                                        "car_id": booking['car_id'],
-                                        "client_name": new_client_name,
-                                        "start_date": new_start.strftime('%Y-%m-%d'),
-                                        "end_date": new_end.strftime('%Y-%m-%d'),
-                                        "amount_paid": estimated_amount,
-                                        "status": "Confirmed"
-                                    }
-                                    
-                                    # Add to bookings
-                                    st.session_state.bookings = pd.concat([bookings, pd.DataFrame([new_booking])], ignore_index=True)
-                                    
-                                    # Update car status and save
-                                    update_car_status(booking['car_id'], "Booked", user_prefix)
-                                    save_data(st.session_state.bookings, "bookings.csv", user_prefix)
-                                    
-                                    # Update pending booking
-                                    for i, pb in enumerate(st.session_state.pending_bookings):
-                                        if pb['id'] == booking['id']:
-                                            st.session_state.pending_bookings[i]['status'] = 'Approved'
-                                    
-                                    # Save updated pending bookings
-                                    st.session_state.persistent_data['pending_bookings']['pending_bookings'] = st.session_state.pending_bookings
-                                    
-                                    del st.session_state[f"edit_booking_{booking['id']}"]
-                                    st.success("✅ Booking edited and approved!")
-                                    st.rerun()
-                            
-                            with col_y:
-                                if st.form_submit_button("❌ Cancel Edit"):
-                                    del st.session_state[f"edit_booking_{booking['id']}"]
-                                    st.rerun()
-                    
-                    st.divider()
-
-        # Key Metrics Section - Always show regardless of pending bookings
-        st.markdown("---")
-        
-        # Key Metrics
-        total_income = 0
-        total_expenses = 0
-        
-        if not bookings.empty and "amount_paid" in bookings.columns:
-            total_income = pd.to_numeric(bookings["amount_paid"], errors='coerce').fillna(0).sum()
-        
-        if not expenses.empty and "amount" in expenses.columns:
-            total_expenses = pd.to_numeric(expenses["amount"], errors='coerce').fillna(0).sum()
-        
-        profit = total_income - total_expenses
-        
-        # Metrics Row
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("💰 Total Income", f"UGX {total_income:,.0f}")
-        with col2:
-            st.metric("🧾 Total Expenses", f"UGX {total_expenses:,.0f}")
-        with col3:
-            st.metric("📊 Net Profit", f"UGX {profit:,.0f}", delta=f"{((profit/total_income)*100) if total_income > 0 else 0:.1f}%")
-        with col4:
-            st.metric("🚗 Total Cars", len(cars))
-
-        # Charts Row
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("### 📈 Monthly Income Trend")
-            if not bookings.empty:
-                bookings_copy = bookings.copy()
-                bookings_copy['start_date'] = pd.to_datetime(bookings_copy['start_date'])
-                bookings_copy['month'] = bookings_copy['start_date'].dt.to_period('M').astype(str)
-                monthly_income = bookings_copy.groupby('month')['amount_paid'].sum().reset_index()
-                
-                fig = px.line(monthly_income, x='month', y='amount_paid', 
-                             title="Monthly Income", markers=True)
-                fig.update_layout(height=300)
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("No booking data available")
-
-        with col2:
-            st.markdown("### 🥧 Expense Breakdown")
-            if not expenses.empty:
-                expense_by_type = expenses.groupby('type')['amount'].sum().reset_index()
-                fig = px.pie(expense_by_type, values='amount', names='type', 
-                           title="Expenses by Type")
-                fig.update_layout(height=300)
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("No expense data available")
-
-        # Status Overview with Quick Actions
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("### 🚗 Car Status Overview")
-            if not cars.empty:
-                status_counts = cars['status'].value_counts()
-                fig = px.bar(x=status_counts.index, y=status_counts.values, 
-                           title="Cars by Status", color=status_counts.index)
-                fig.update_layout(height=300)
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("No cars registered")
-
-        with col2:
-            st.markdown("### ⚡ Quick Actions")
-            active_bookings = bookings[bookings['status'] == 'Booked'] if not bookings.empty else pd.DataFrame()
-            
-            if not active_bookings.empty:
-                st.markdown("**Complete Bookings:**")
-                for _, booking in active_bookings.iterrows():
-                    col_a, col_b = st.columns([3, 1])
-                    with col_a:
-                        st.write(f"📅 {booking['client_name']} - {booking['start_date']}")
-                    with col_b:
-                        if st.button("✅", key=f"complete_{booking['id']}", help="Complete booking"):
-                            if complete_booking(booking['id'], user_prefix):
-                                st.success("Booking completed!")
-                                st.rerun()
-            else:
-                st.info("No active bookings")
-        
-        # Show message about pending bookings if none exist
-        if not user_pending:
-            if len(pending_bookings) > 0:
-                st.info(f"ℹ️ No pending booking requests for you. Total system bookings: {len(pending_bookings)}")
-            else:
-                st.info("ℹ️ No pending booking requests. Share your booking link to receive requests!")
+        dashboard_view(user_prefix)
 
     # ---------- Enhanced Cars Section ----------
     elif menu == "🚗 Cars":
+        cars = get_table('cars')
         st.markdown("# 🚗 Car Management")
         
         # Edit Mode Toggle
@@ -817,37 +1564,31 @@ def main_app():
         if not cars.empty:
             if edit_mode:
                 st.markdown("### Edit Car Details")
-                selected_car_id = st.selectbox("Select Car to Edit", 
-                                             cars['id'].values,
-                                             format_func=lambda x: f"{cars[cars['id']==x].iloc[0]['car_name']} ({cars[cars['id']==x].iloc[0]['plate_number']})")
-                
-                if selected_car_id:
-                    car_data = cars[cars['id'] == selected_car_id].iloc[0]
-                    
-                    with st.form("edit_car"):
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            new_name = st.text_input("Car Name", value=car_data['car_name'])
-                        with col2:
-                            new_plate = st.text_input("Plate Number", value=car_data['plate_number'])
-                        with col3:
-                            new_model = st.text_input("Model", value=car_data['model'])
-                        
-                        new_status = st.selectbox("Status", ["Available", "Booked", "Maintenance"], 
-                                                index=["Available", "Booked", "Maintenance"].index(car_data['status']))
-                        
-                        if st.form_submit_button("💾 Update Car"):
-                            if new_name and new_plate and new_model:
-                                st.session_state.cars.loc[st.session_state.cars['id'] == selected_car_id, 'car_name'] = new_name
-                                st.session_state.cars.loc[st.session_state.cars['id'] == selected_car_id, 'plate_number'] = new_plate
-                                st.session_state.cars.loc[st.session_state.cars['id'] == selected_car_id, 'model'] = new_model
-                                st.session_state.cars.loc[st.session_state.cars['id'] == selected_car_id, 'status'] = new_status
-                                save_data(st.session_state.cars, "cars.csv", user_prefix)
-                                st.success("✅ Car updated and saved!")
-                                st.rerun()
+                # Edit cells in place; the categorical status column renders
+                # as a dropdown and all edits land in one bulk save
+                edited_cars = st.data_editor(cars, key="cars_editor",
+                                             disabled=['id'],
+                                             use_container_width=True,
+                                             hide_index=True)
+                if st.button("💾 Save Changes", key="save_car_edits"):
+                    if not edited_cars.equals(cars):
+                        st.session_state.cars = index_by_id(
+                            apply_table_schema(edited_cars, 'cars'))
+                        save_data(st.session_state.cars, "cars.csv", user_prefix)
+                        st.session_state.pop('car_options_cache', None)
+                        st.session_state.pop('available_car_ids', None)
+                        _bookings_with_car_names.clear()
+                        # Status edits change the overview chart but not the
+                        # cars fingerprint, so clear like update_car_status
+                        _dashboard_charts.clear()
+                        _expense_pie.clear()
+                        st.success("✅ Changes saved!")
+                        st.rerun()
+                    else:
+                        st.info("No changes to save.")
             
             st.markdown("### Current Fleet")
-            st.dataframe(cars, use_container_width=True)
+            paginated_dataframe(cars.reset_index(drop=True), "Fleet")
         else:
             st.info("No cars registered yet. Add your first car below!")
 
@@ -865,7 +1606,7 @@ def main_app():
             if st.form_submit_button("Add Car"):
                 if name and plate and model:
                     # Generate proper ID
-                    new_id = 1 if cars.empty else int(cars['id'].max()) + 1
+                    new_id = next_id('cars')
                     
                     new_car = {
                         "id": new_id, 
@@ -873,15 +1614,18 @@ def main_app():
                         "plate_number": plate, 
                         "model": model,
                         "status": "Available", 
-                        "last_service_date": dt.date.today().strftime("%Y-%m-%d"), 
+                        "last_service_date": dt.date.today().isoformat(), 
                         "next_service_date": ""
                     }
                     
                     # Update session state
-                    st.session_state.cars = pd.concat([cars, pd.DataFrame([new_car])], ignore_index=True)
-                    
+                    st.session_state.cars = index_by_id(append_rows(cars, [new_car], 'cars'))
+                    id_sets = st.session_state.get('available_car_ids')
+                    if id_sets is not None and user_prefix in id_sets:
+                        id_sets[user_prefix].add(new_id)
+
                     # Save to persistent storage
-                    save_data(st.session_state.cars, "cars.csv", user_prefix)
+                    save_new_row(st.session_state.cars, new_car, "cars.csv", user_prefix)
                     
                     st.success(f"✅ Car '{name}' added successfully and saved to your account!")
                     st.rerun()
@@ -890,6 +1634,8 @@ def main_app():
 
     # ---------- Enhanced Bookings Section ----------
     elif menu == "📅 Bookings":
+        cars = get_table('cars')
+        bookings = get_table('bookings')
         st.markdown("# 📅 Booking Management")
         
         if cars.empty:
@@ -900,65 +1646,16 @@ def main_app():
             
             if not bookings.empty:
                 if edit_mode:
-                    st.markdown("### Edit Booking")
-                    selected_booking_id = st.selectbox("Select Booking to Edit", 
-                                                     bookings['id'].values,
-                                                     format_func=lambda x: f"{bookings[bookings['id']==x].iloc[0]['client_name']} - {bookings[bookings['id']==x].iloc[0]['start_date']}")
-                    
-                    if selected_booking_id:
-                        booking_data = bookings[bookings['id'] == selected_booking_id].iloc[0]
-                        
-                        with st.form("edit_booking"):
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                new_client = st.text_input("Client Name", value=booking_data['client_name'])
-                                new_start = st.date_input("Start Date", value=pd.to_datetime(booking_data['start_date']).date())
-                                new_amount = st.number_input("Amount", value=float(booking_data['amount_paid']))
-                            with col2:
-                                new_end = st.date_input("End Date", value=pd.to_datetime(booking_data['end_date']).date())
-                                new_status = st.selectbox("Status", ["Booked", "Completed", "Cancelled"], 
-                                                        index=["Booked", "Completed", "Cancelled"].index(booking_data['status']))
-                            
-                            # Check for date conflicts when editing
-                            if new_start and new_end:
-                                has_conflict, conflicts = check_date_overlap(booking_data['car_id'], new_start, new_end, selected_booking_id)
-                                if has_conflict:
-                                    st.warning("⚠️ Date conflict detected with existing bookings:")
-                                    for conflict in conflicts:
-                                        st.write(f"• {conflict['client']} ({conflict['start']} to {conflict['end']})")
-                            
-                            if st.form_submit_button("💾 Update Booking"):
-                                if new_client and new_amount > 0 and new_start and new_end:
-                                    # Check conflicts again before saving
-                                    has_conflict, conflicts = check_date_overlap(booking_data['car_id'], new_start, new_end, selected_booking_id)
-                                    
-                                    if has_conflict and new_status == "Booked":
-                                        st.error("Cannot update booking due to date conflicts with existing bookings.")
-                                    else:
-                                        st.session_state.bookings.loc[st.session_state.bookings['id'] == selected_booking_id, 'client_name'] = new_client
-                                        st.session_state.bookings.loc[st.session_state.bookings['id'] == selected_booking_id, 'start_date'] = new_start.strftime("%Y-%m-%d")
-                                        st.session_state.bookings.loc[st.session_state.bookings['id'] == selected_booking_id, 'end_date'] = new_end.strftime("%Y-%m-%d")
-                                        st.session_state.bookings.loc[st.session_state.bookings['id'] == selected_booking_id, 'amount_paid'] = new_amount
-                                        st.session_state.bookings.loc[st.session_state.bookings['id'] == selected_booking_id, 'status'] = new_status
-                                        save_data(st.session_state.bookings, "bookings.csv", user_prefix)
-                                        st.success("Booking updated successfully!")
-                                        st.rerun()
-                                else:
-                                    st.error("Please fill in all fields correctly.")
+                    _edit_booking_section(user_prefix)
                 
                 st.markdown("### Current Bookings")
                 # Enhanced booking display with status and conflict info
-                display_bookings = bookings.copy()
-                if not display_bookings.empty:
-                    # Add car names to booking display
-                    display_bookings = display_bookings.merge(
-                        cars[['id', 'car_name']], 
-                        left_on='car_id', 
-                        right_on='id', 
-                        suffixes=('', '_car')
-                    ).drop('id_car', axis=1)
-                    
-                st.dataframe(display_bookings, use_container_width=True)
+                display_bookings = _bookings_with_car_names(
+                    user_prefix, len(bookings), len(cars),
+                    int(bookings['id'].max()) if not bookings.empty else 0,
+                    int(cars['id'].max()) if not cars.empty else 0,
+                    bookings, cars)
+                paginated_dataframe(display_bookings, "Bookings")
             
             # Enhanced booking form with availability check
             with st.form("add_booking"):
@@ -969,10 +1666,10 @@ def main_app():
                     st.warning("No cars available for booking.")
                     car_id = None
                 else:
-                    car_display = cars.apply(lambda x: f"{x['car_name']} ({x['plate_number']})", axis=1)
+                    car_ids, car_display = car_options(cars)
                     selected_idx = st.selectbox("Select Car", range(len(cars)), 
-                                               format_func=lambda x: car_display.iloc[x])
-                    car_id = cars.iloc[selected_idx]["id"] if selected_idx is not None else None
+                                               format_func=lambda x: car_display[x])
+                    car_id = car_ids[selected_idx] if selected_idx is not None else None
                     
                     # Show car availability status
                     if car_id:
@@ -1013,18 +1710,18 @@ def main_app():
                             st.error("Cannot create booking due to date conflicts. Enable 'Allow overlapping bookings' if this is intentional.")
                         else:
                             new_booking = {
-                                "id": len(bookings)+1, "car_id": car_id, "client_name": client,
-                                "start_date": start.strftime("%Y-%m-%d"), "end_date": end.strftime("%Y-%m-%d"), 
+                                "id": next_id('bookings'), "car_id": car_id, "client_name": client,
+                                "start_date": start.isoformat(), "end_date": end.isoformat(), 
                                 "amount_paid": amount, "status": "Booked"
                             }
-                            st.session_state.bookings = pd.concat([bookings, pd.DataFrame([new_booking])], ignore_index=True)
+                            st.session_state.bookings = index_by_id(append_rows(bookings, [new_booking], 'bookings'))
+                            record_recent_booking(new_booking)
                             
                             # Update car status to "Booked" if not already
-                            current_car = cars[cars['id'] == car_id].iloc[0]
-                            if current_car['status'] != "Booked":
+                            if cars.at[car_id, 'status'] != "Booked":
                                 update_car_status(car_id, "Booked", user_prefix)
                             
-                            save_data(st.session_state.bookings, "bookings.csv", user_prefix)
+                            save_new_row(st.session_state.bookings, new_booking, "bookings.csv", user_prefix)
                             
                             if has_conflict:
                                 st.success("Booking added successfully! ⚠️ Note: This booking overlaps with existing bookings.")
@@ -1036,6 +1733,8 @@ def main_app():
 
     # ---------- Enhanced Expenses Section ----------
     elif menu == "💰 Expenses":
+        cars = get_table('cars')
+        expenses = get_table('expenses')
         st.markdown("# 💰 Expense Management")
         
         if cars.empty:
@@ -1046,43 +1745,18 @@ def main_app():
             
             if not expenses.empty:
                 if edit_mode:
-                    st.markdown("### Edit Expense")
-                    selected_expense_id = st.selectbox("Select Expense to Edit", 
-                                                     expenses['id'].values,
-                                                     format_func=lambda x: f"{expenses[expenses['id']==x].iloc[0]['description']} - UGX {expenses[expenses['id']==x].iloc[0]['amount']}")
-                    
-                    if selected_expense_id:
-                        expense_data = expenses[expenses['id'] == selected_expense_id].iloc[0]
-                        
-                        with st.form("edit_expense"):
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                new_desc = st.text_input("Description", value=expense_data['description'])
-                            with col2:
-                                new_amount = st.number_input("Amount", value=float(expense_data['amount']))
-                            with col3:
-                                new_type = st.selectbox("Type", ["Fuel", "Maintenance", "Insurance", "Repairs", "Other"],
-                                                       index=["Fuel", "Maintenance", "Insurance", "Repairs", "Other"].index(expense_data['type']))
-                            
-                            if st.form_submit_button("💾 Update Expense"):
-                                if new_desc and new_amount > 0:
-                                    st.session_state.expenses.loc[st.session_state.expenses['id'] == selected_expense_id, 'description'] = new_desc
-                                    st.session_state.expenses.loc[st.session_state.expenses['id'] == selected_expense_id, 'amount'] = new_amount
-                                    st.session_state.expenses.loc[st.session_state.expenses['id'] == selected_expense_id, 'type'] = new_type
-                                    save_data(st.session_state.expenses, "expenses.csv", user_prefix)
-                                    st.success("Expense updated successfully!")
-                                    st.rerun()
+                    _edit_expense_section(user_prefix)
                 
                 st.markdown("### Expense History")
-                st.dataframe(expenses, use_container_width=True)
+                paginated_dataframe(expenses.reset_index(drop=True), "Expenses")
             
             # Add new expense form (unchanged from previous version)
             with st.form("add_expense"):
                 st.markdown("#### ➕ Record Expense")
-                car_display = cars.apply(lambda x: f"{x['car_name']} ({x['plate_number']})", axis=1)
+                car_ids, car_display = car_options(cars)
                 selected_idx = st.selectbox("Select Car", range(len(cars)), 
-                                           format_func=lambda x: car_display.iloc[x])
-                car_id = cars.iloc[selected_idx]["id"] if selected_idx is not None else None
+                                           format_func=lambda x: car_display[x])
+                car_id = car_ids[selected_idx] if selected_idx is not None else None
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -1090,16 +1764,16 @@ def main_app():
                 with col2:
                     amt = st.number_input("Amount (UGX)", min_value=0)
                 with col3:
-                    etype = st.selectbox("Type", ["Fuel", "Maintenance", "Insurance", "Repairs", "Other"])
+                    etype = st.selectbox("Type", EXPENSE_TYPES)
                 
                 if st.form_submit_button("Add Expense"):
                     if car_id and desc and amt > 0:
                         new_exp = {
-                            "id": len(expenses)+1, "car_id": car_id, "date": dt.date.today().strftime("%Y-%m-%d"), 
+                            "id": next_id('expenses'), "car_id": car_id, "date": dt.date.today().isoformat(), 
                             "description": desc, "amount": amt, "type": etype
                         }
-                        st.session_state.expenses = pd.concat([expenses, pd.DataFrame([new_exp])], ignore_index=True)
-                        save_data(st.session_state.expenses, "expenses.csv", user_prefix)
+                        st.session_state.expenses = index_by_id(append_rows(expenses, [new_exp], 'expenses'))
+                        save_new_row(st.session_state.expenses, new_exp, "expenses.csv", user_prefix)
                         st.success("Expense recorded successfully!")
                         st.rerun()
                     else:
@@ -1107,14 +1781,70 @@ def main_app():
 
     # ---------- Maintenance Section ----------
     elif menu == "🔧 Maintenance":
+        cars = get_table('cars')
         st.markdown("# 🔧 Maintenance Schedule")
         if not cars.empty:
-            maintenance_data = cars[["car_name", "last_service_date", "next_service_date", "status"]]
-            st.dataframe(maintenance_data, use_container_width=True)
+            maintenance_data = cars[["car_name", "last_service_date", "next_service_date", "status"]].reset_index(drop=True)
+            paginated_dataframe(maintenance_data, "Maintenance")
         else:
             st.info("No cars registered yet.")
 
 # ---------- Public Booking Functions ----------
+# Pending bookings survive a server restart through an append-only JSONL
+# journal: saves append the full record, approve/reject append an
+# {id, status} patch, and the file is compacted once patches pile up
+PENDING_JOURNAL = "pending_bookings.jsonl"
+
+def _append_pending_line(record):
+    """Queue one pending-booking event onto the writer thread"""
+    _persist_executor().submit(
+        _append_journal_line, PENDING_JOURNAL, json.dumps(record, default=str))
+
+def _rewrite_pending_journal(text):
+    # Same tmp+fsync+os.replace dance as the Parquet writer, so a crash
+    # mid-compaction never loses the journal
+    try:
+        tmp_path = PENDING_JOURNAL + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, PENDING_JOURNAL)
+    except Exception:
+        pass
+
+def _journal_pending_update(booking_id, status):
+    """Journal a status flip as a patch record, compacting past the threshold"""
+    store = st.session_state.persistent_data
+    store['pending_patches'] = store.get('pending_patches', 0) + 1
+    if store['pending_patches'] >= JOURNAL_COMPACT_ROWS:
+        store['pending_patches'] = 0
+        snapshot = '\n'.join(
+            json.dumps(b, default=str)
+            for b in st.session_state.pending_bookings.values())
+        _persist_executor().submit(_rewrite_pending_journal, snapshot + '\n' if snapshot else '')
+    else:
+        _append_pending_line({'id': booking_id, 'status': status})
+
+def _replay_pending_journal():
+    """Rebuild the pending dict from the JSONL journal after a restart"""
+    pending = {}
+    try:
+        with open(PENDING_JOURNAL) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                if 'owner' in rec:
+                    pending[rec['id']] = rec
+                elif rec.get('id') in pending:
+                    pending[rec['id']]['status'] = rec.get('status')
+    except FileNotFoundError:
+        pass
+    except Exception:
+        pass
+    return pending
+
 def save_public_booking(booking_data):
     """Save public booking to pending bookings with enhanced debugging"""
     # Initialize persistent storage if not exists
@@ -1125,37 +1855,82 @@ def save_public_booking(booking_data):
     if 'pending_bookings' not in st.session_state.persistent_data:
         st.session_state.persistent_data['pending_bookings'] = {}
     
-    if 'pending_bookings' not in st.session_state:
-        st.session_state.pending_bookings = []
+    # Load the existing pending dict (shared store, or journal replay on a
+    # cold start) before appending — a fresh `{}` here would be pushed into
+    # the shared store by _persist_pending and clobber other owners' requests
+    load_pending_bookings()
     
-    # Generate unique ID based on existing pending bookings
-    existing_ids = [pb.get('id', 0) for pb in st.session_state.pending_bookings]
-    booking_data['id'] = max(existing_ids) + 1 if existing_ids else 1
+    # Monotonic id held in the shared store, so concurrent public sessions
+    # draw from one counter instead of each seeding their own; the loaded
+    # dict includes journal-replayed rows, so the seed can't reissue ids
+    store = st.session_state.persistent_data['pending_bookings']
+    if '_next_id' not in store:
+        store['_next_id'] = max(st.session_state.pending_bookings, default=0) + 1
+    booking_data['id'] = store['_next_id']
+    store['_next_id'] += 1
     booking_data['submission_date'] = dt.datetime.now().isoformat()
     booking_data['status'] = 'Pending'
     
-    st.session_state.pending_bookings.append(booking_data)
-    
-    # Save to persistent storage - use 'pending_bookings' as key directly
-    try:
-        st.session_state.persistent_data['pending_bookings']['pending_bookings'] = st.session_state.pending_bookings
-    except Exception:
-        # Fallback initialization
-        st.session_state.persistent_data['pending_bookings'] = {'pending_bookings': st.session_state.pending_bookings}
+    st.session_state.pending_bookings[booking_data['id']] = booking_data
+    _append_pending_line(booking_data)
+    _persist_pending()
+
+def _persist_pending():
+    """Point the shared store at the session's pending dict and bump the version.
+
+    The dict is shared by reference — mutations are visible to every
+    session immediately — so this is one assignment, not an O(N) list
+    snapshot per write. The loader accepts the legacy list layout too.
+    """
+    st.session_state.persistent_data.setdefault('pending_bookings', {})['pending_bookings'] = \
+        st.session_state.pending_bookings
+    _bump_pending_version()
+
+def _bump_pending_version():
+    """Invalidate per-owner pending caches after any pending mutation"""
+    store = st.session_state.persistent_data
+    store['pending_version'] = store.get('pending_version', 0) + 1
+
+def user_pending_bookings(user_prefix):
+    """(all_pending, owner's pending) with the owner filter memoized.
+
+    The sidebar and the Dashboard fragment both need this; the filter only
+    reruns when a pending booking is added or changes status, tracked by
+    the shared version counter.
+    """
+    pending = load_pending_bookings()
+    version = st.session_state.persistent_data.get('pending_version', 0)
+    cache_key = (user_prefix, version, len(pending))
+    cached = st.session_state.get('user_pending_cache')
+    if cached is not None and cached[0] == cache_key:
+        return pending, cached[1]
+    user_pending = [b for b in pending.values()
+                    if b.get('owner') == user_prefix and b.get('status') == 'Pending']
+    st.session_state.user_pending_cache = (cache_key, user_pending)
+    return pending, user_pending
 
 def load_pending_bookings():
-    """Load pending bookings from storage"""
+    """Load pending bookings from storage as an id-keyed dict.
+
+    Approve/reject handlers flip status by id in O(1); persistence keeps
+    the legacy list-of-dicts layout via list(values()).
+    """
     if 'pending_bookings' not in st.session_state:
         # Try to load from persistent storage
         try:
             if ('pending_bookings' in st.session_state.persistent_data and 
                 'pending_bookings' in st.session_state.persistent_data['pending_bookings']):
                 stored_data = st.session_state.persistent_data['pending_bookings']['pending_bookings']
-                st.session_state.pending_bookings = stored_data if isinstance(stored_data, list) else []
+                if isinstance(stored_data, dict):
+                    st.session_state.pending_bookings = stored_data
+                elif isinstance(stored_data, list):
+                    st.session_state.pending_bookings = {b.get('id'): b for b in stored_data}
+                else:
+                    st.session_state.pending_bookings = {}
             else:
-                st.session_state.pending_bookings = []
+                st.session_state.pending_bookings = _replay_pending_journal()
         except Exception:
-            st.session_state.pending_bookings = []
+            st.session_state.pending_bookings = {}
     
     return st.session_state.pending_bookings
 
@@ -1189,12 +1964,12 @@ def show_public_booking():
         return
     
     # Verify owner exists
-    users = load_users()
-    if owner_username not in users['username'].values:
+    directory = user_directory()
+    if owner_username not in directory:
         st.error("❌ Car owner not found. Please check the booking link.")
         return
     
-    owner_name = users[users['username'] == owner_username]['full_name'].iloc[0]
+    owner_name = directory[owner_username][1]
     
     st.markdown(f"### 🏢 Booking with **{owner_name}**")
     
@@ -1206,19 +1981,22 @@ def show_public_booking():
         st.info("Please contact them directly or try again later.")
         return
     
-    available_cars = owner_cars[owner_cars['status'] == 'Available']
+    # O(k) row pull through the id index instead of an isin scan per rerun
+    available_cars = owner_cars.loc[
+        owner_cars.index.intersection(list(available_car_ids(owner_cars, owner_username)))
+    ]
     
     if available_cars.empty:
         st.warning(f"⚠️ All of {owner_name}'s cars are currently booked.")
         st.markdown("### All Cars (Check availability)")
-        display_cars = owner_cars[['car_name', 'model', 'plate_number', 'status']].copy()
+        display_cars = owner_cars[['car_name', 'model', 'plate_number', 'status']]
         st.dataframe(display_cars, use_container_width=True)
         st.info("Please contact the owner directly or choose different dates.")
         return
     
     # Show available cars
     st.markdown("### 🚗 Available Cars")
-    display_cars = available_cars[['car_name', 'model', 'plate_number']].copy()
+    display_cars = available_cars[['car_name', 'model', 'plate_number']]
     st.dataframe(display_cars, use_container_width=True)
     
     # Initialize session state for form reset
@@ -1255,14 +2033,19 @@ def show_public_booking():
         st.markdown("#### 📝 Booking Details")
         
         # Car selection
-        car_options = available_cars.apply(lambda x: f"{x['car_name']} - {x['model']} ({x['plate_number']})", axis=1)
-        if len(available_cars) == 1:
-            st.info(f"**Selected Car:** {car_options.iloc[0]}")
-            selected_car = available_cars.iloc[0]
+        car_options = (available_cars['car_name'].astype(str) + " - "
+                       + available_cars['model'].astype(str)
+                       + " (" + available_cars['plate_number'].astype(str) + ")").tolist()
+        # Row dicts via to_dict so the submit path reads plain values with
+        # no per-field Series indexing
+        car_records = available_cars[['id', 'car_name', 'model', 'plate_number']].to_dict('records')
+        if len(car_records) == 1:
+            st.info(f"**Selected Car:** {car_options[0]}")
+            selected_car = car_records[0]
         else:
-            selected_car_idx = st.selectbox("Select Car", range(len(available_cars)), 
-                                           format_func=lambda x: car_options.iloc[x])
-            selected_car = available_cars.iloc[selected_car_idx] if selected_car_idx is not None else None
+            selected_car_idx = st.selectbox("Select Car", range(len(car_records)), 
+                                           format_func=lambda x: car_options[x])
+            selected_car = car_records[selected_car_idx] if selected_car_idx is not None else None
         
         # Customer details
         col1, col2 = st.columns(2)
@@ -1294,6 +2077,10 @@ def show_public_booking():
             elif selected_car is None:
                 st.error("Please select a car.")
             else:
+                # Format each date once; both dicts below reuse the strings
+                start_s = start_date.isoformat()
+                end_s = end_date.isoformat()
+                
                 # Create booking request
                 booking_request = {
                     'owner': owner_username,
@@ -1304,8 +2091,8 @@ def show_public_booking():
                     'client_name': client_name,
                     'client_phone': client_phone,
                     'client_email': client_email,
-                    'start_date': start_date.strftime('%Y-%m-%d'),
-                    'end_date': end_date.strftime('%Y-%m-%d'),
+                    'start_date': start_s,
+                    'end_date': end_s,
                     'purpose': purpose,
                     'additional_notes': additional_notes
                 }
@@ -1317,8 +2104,8 @@ def show_public_booking():
                     'car_name': selected_car['car_name'],
                     'car_model': selected_car['model'],
                     'owner_name': owner_name,
-                    'start_date': start_date.strftime('%Y-%m-%d'),
-                    'end_date': end_date.strftime('%Y-%m-%d'),
+                    'start_date': start_s,
+                    'end_date': end_s,
                     'duration': (end_date - start_date).days + 1,
                     'client_name': client_name,
                     'client_phone': client_phone
@@ -1329,49 +2116,105 @@ def show_public_booking():
                 st.rerun()
 
 # ---------- Enhanced Sidebar with Data Management ----------
+def _df_to_columnar(df):
+    """Column-oriented export payload: C column lists instead of N row dicts"""
+    return {"columns": list(df.columns), "data": {c: df[c].tolist() for c in df.columns}}
+
+def _frame_from_payload(payload):
+    """Rebuild a frame from the columnar layout or a legacy records list"""
+    if isinstance(payload, dict):
+        return pd.DataFrame(payload['data'], columns=payload['columns'])
+    return pd.DataFrame(payload)
+
+def _dumps_backup(payload):
+    """Serialize a backup payload compactly, preferring orjson's C encoder.
+
+    No indentation — the download is for re-import, not reading — and a
+    light gzip pass cuts the repetitive JSON several-fold for the
+    network round trip.
+    """
+    if orjson is not None:
+        raw = orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return gzip.compress(raw, compresslevel=1)
+
+def _loads_backup(raw):
+    """Parse uploaded backup bytes (gzipped or plain legacy JSON)"""
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: id})
+def _build_export(username, n_cars, n_bookings, n_expenses,
+                  cars_sig, bookings_sig, expenses_sig, cars, bookings, expenses):
+    """Build the downloadable backup bytes once per data change.
+
+    Fingerprint-keyed like the dashboard caches, so re-clicking Export
+    (or rerunning with the button still drawn) reuses the encoded blob.
+    """
+    # Empty tables are omitted entirely; the import branch already treats
+    # a missing key the same as an empty payload
+    export_data = {
+        name: _df_to_columnar(frame)
+        for name, frame in (('cars', cars), ('bookings', bookings), ('expenses', expenses))
+        if not frame.empty
+    }
+    export_data['export_date'] = dt.datetime.now().isoformat()
+    export_data['user'] = username
+    return _dumps_backup(export_data)
+
 def show_data_management_section():
     """Show data management options in sidebar"""
     st.sidebar.markdown("---")
     st.sidebar.markdown("### 📊 Data Management")
+
+    # Force any queued writes to disk right now
+    if st.sidebar.button("💾 Save Now"):
+        flush_dirty_tables(force=True)
+        st.sidebar.success("✅ All changes saved to disk!")
     
     # Export data
     if st.sidebar.button("📤 Export Data"):
         user_prefix = st.session_state.username
-        export_data = {
-            'cars': st.session_state.cars.to_dict('records') if not st.session_state.cars.empty else [],
-            'bookings': st.session_state.bookings.to_dict('records') if not st.session_state.bookings.empty else [],
-            'expenses': st.session_state.expenses.to_dict('records') if not st.session_state.expenses.empty else [],
-            'export_date': dt.datetime.now().isoformat(),
-            'user': user_prefix
-        }
+        cars, bookings, expenses = get_table('cars'), get_table('bookings'), get_table('expenses')
         
         st.sidebar.download_button(
             label="💾 Download Backup",
-            data=json.dumps(export_data, indent=2),
-            file_name=f"{user_prefix}_backup_{dt.date.today().strftime('%Y%m%d')}.json",
-            mime="application/json"
+            data=_build_export(
+                user_prefix, len(cars), len(bookings), len(expenses),
+                int(cars['id'].max()) if not cars.empty else 0,
+                int(bookings['id'].max()) if not bookings.empty else 0,
+                int(expenses['id'].max()) if not expenses.empty else 0,
+                cars, bookings, expenses),
+            file_name=f"{user_prefix}_backup_{dt.date.today().strftime('%Y%m%d')}.json.gz",
+            mime="application/gzip"
         )
     
     # Import data
-    uploaded_file = st.sidebar.file_uploader("📥 Import Backup", type=['json'])
+    uploaded_file = st.sidebar.file_uploader("📥 Import Backup", type=['json', 'gz'])
     if uploaded_file is not None:
         try:
-            import_data = json.load(uploaded_file)
+            import_data = _loads_backup(uploaded_file.getvalue())
             user_prefix = st.session_state.username
             
-            # Restore data with validation
-            if 'cars' in import_data and import_data['cars']:
-                st.session_state.cars = pd.DataFrame(import_data['cars'])
-                save_data(st.session_state.cars, "cars.csv", user_prefix)
-            
-            if 'bookings' in import_data and import_data['bookings']:
-                st.session_state.bookings = pd.DataFrame(import_data['bookings'])
-                save_data(st.session_state.bookings, "bookings.csv", user_prefix)
-            
-            if 'expenses' in import_data and import_data['expenses']:
-                st.session_state.expenses = pd.DataFrame(import_data['expenses'])
-                save_data(st.session_state.expenses, "expenses.csv", user_prefix)
-            
+            # Restore data with validation, one shared path per table
+            for name in TABLE_COLUMNS:
+                if import_data.get(name):
+                    st.session_state[name] = index_by_id(
+                        apply_table_schema(_frame_from_payload(import_data[name]), name))
+                    save_data(st.session_state[name], f"{name}.csv", user_prefix)
+
+            # Imported frames invalidate everything derived from the old
+            # ones, same as the user-switch path
+            for stale_key in ('id_counters', 'available_car_ids',
+                              'car_options_cache', 'recent_bookings'):
+                st.session_state.pop(stale_key, None)
+            _dashboard_totals.clear()
+            _dashboard_charts.clear()
+            _expense_pie.clear()
             st.sidebar.success("✅ Data imported and saved successfully!")
             st.rerun()
         except Exception as e:
@@ -1396,9 +2239,6 @@ def main():
         else:
             show_login()
 
-# Run the app
-if __name__ == "__main__":
-    main()
-else:
-    # When running in Streamlit, call main directly
-    main()
+# Run the app unconditionally — Streamlit re-executes the script on every
+# rerun whether it's imported or run as __main__
+main()
@@ -7,8 +7,83 @@ import pandas as pd
 import os
 import json
 import datetime as dt
+import concurrent.futures
+from functools import partial
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # optional; falls back to stdlib json
+
+# Declared id/amount dtypes for legacy CSV reads, mirroring the app's
+# table schemas; skips pandas' two-pass type inference. Date columns are
+# left as text on purpose — backups re-serialize them to JSON anyway.
+TABLE_DTYPES = {
+    "cars": {"id": "Int64"},
+    "bookings": {"id": "Int64", "car_id": "Int64", "amount_paid": "Int64"},
+    "expenses": {"id": "Int64", "car_id": "Int64", "amount": "Int64"},
+}
+
+def df_to_columnar(df):
+    """Column-oriented backup payload: C column lists instead of N row dicts"""
+    return {"columns": list(df.columns), "data": {c: df[c].tolist() for c in df.columns}}
+
+def frame_from_payload(payload):
+    """Rebuild a frame from the columnar layout or a legacy records list"""
+    if isinstance(payload, dict):
+        return pd.DataFrame(payload['data'], columns=payload['columns'])
+    return pd.DataFrame(payload)
+
+def load_user_table(username, table, existing=None):
+    """Load one user table, preferring the Parquet file the app writes.
+
+    Pass the set of data filenames (from one directory listing) to skip
+    the per-table stat calls when backing up many users.
+    """
+    def _present(name):
+        return name in existing if existing is not None else os.path.exists(name)
+
+    parquet_file = f"{username}_{table}.parquet"
+    if _present(parquet_file):
+        return pd.read_parquet(parquet_file)
+    csv_file = f"{username}_{table}.csv"
+    if _present(csv_file):
+        return pd.read_csv(csv_file, dtype=TABLE_DTYPES.get(table))
+    return None
+
+def list_data_files():
+    """One readdir pass over the data directory instead of stat-per-table"""
+    return {p.name for p in Path(".").glob("*_*.parquet")} | \
+           {p.name for p in Path(".").glob("*_*.csv")}
+
+def backup_one_user(user, timestamp, backup_dir, data_files=None):
+    """Back up one user's tables to a compact JSON file.
+
+    Top-level so the all-users path can run it in worker processes.
+    """
+    user_data = {}
+
+    # The app stores tables as Parquet now; fall back to legacy CSVs
+    # for users who never ran the migrated app
+    for table in ("cars", "bookings", "expenses"):
+        table_df = load_user_table(user, table, data_files)
+        if table_df is not None and len(table_df):
+            user_data[table] = df_to_columnar(table_df)
+
+    if user_data:
+        backup_file = Path(backup_dir) / f"{user}_backup_{timestamp}.json"
+        # Compact JSON written in one buffered binary pass; indentation
+        # only inflates files that exist to be re-imported
+        if orjson is not None:
+            payload = orjson.dumps(user_data, default=str,
+                                   option=orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            payload = json.dumps(user_data, separators=(",", ":"), default=str).encode()
+        with open(backup_file, 'wb', buffering=1 << 20) as f:
+            f.write(payload)
+        print(f"✅ Backed up data for user '{user}' to {backup_file}")
+
 def backup_user_data(username=None):
     """Backup user data to JSON format"""
     backup_dir = Path("backups")
@@ -23,36 +98,23 @@ def backup_user_data(username=None):
         # Backup all users
         users_to_backup = []
         if os.path.exists("users.csv"):
-            users_df = pd.read_csv("users.csv")
-            users_to_backup = users_df["username"].tolist()
+            # Only the username column matters here; skip inference on the
+            # auth fields
+            users_to_backup = pd.read_csv(
+                "users.csv", usecols=["username"], dtype="string"
+            )["username"].tolist()
     
-    for user in users_to_backup:
-        user_data = {}
-        
-        # Backup cars
-        cars_file = f"{user}_cars.csv"
-        if os.path.exists(cars_file):
-            cars_df = pd.read_csv(cars_file)
-            user_data["cars"] = cars_df.to_dict('records')
-        
-        # Backup bookings
-        bookings_file = f"{user}_bookings.csv"
-        if os.path.exists(bookings_file):
-            bookings_df = pd.read_csv(bookings_file)
-            user_data["bookings"] = bookings_df.to_dict('records')
-        
-        # Backup expenses
-        expenses_file = f"{user}_expenses.csv"
-        if os.path.exists(expenses_file):
-            expenses_df = pd.read_csv(expenses_file)
-            user_data["expenses"] = expenses_df.to_dict('records')
-        
-        # Save backup
-        if user_data:
-            backup_file = backup_dir / f"{user}_backup_{timestamp}.json"
-            with open(backup_file, 'w') as f:
-                json.dump(user_data, f, indent=2)
-            print(f"✅ Backed up data for user '{user}' to {backup_file}")
+    data_files = list_data_files()
+    if len(users_to_backup) > 1:
+        # Users are independent and the work is parse-bound, so fan out
+        # across a process pool when backing up the whole deployment
+        with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            list(ex.map(partial(backup_one_user, timestamp=timestamp,
+                                backup_dir=str(backup_dir), data_files=data_files),
+                        users_to_backup))
+    else:
+        for user in users_to_backup:
+            backup_one_user(user, timestamp, str(backup_dir), data_files)
     
     # Backup users file
     if os.path.exists("users.csv"):
@@ -62,30 +124,23 @@ def backup_user_data(username=None):
 
 def restore_user_data(backup_file_path):
     """Restore user data from JSON backup"""
-    with open(backup_file_path, 'r') as f:
-        user_data = json.load(f)
+    # One buffered binary read, then parse from memory — multi-MB backups
+    # otherwise page through the default 8 KiB buffer
+    with open(backup_file_path, 'rb', buffering=1 << 20) as f:
+        raw = f.read()
+    user_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     
     # Extract username from filename
     filename = Path(backup_file_path).name
     username = filename.split('_backup_')[0]
     
-    # Restore cars
-    if "cars" in user_data and user_data["cars"]:
-        cars_df = pd.DataFrame(user_data["cars"])
-        cars_df.to_csv(f"{username}_cars.csv", index=False)
-        print(f"✅ Restored cars data for {username}")
-    
-    # Restore bookings
-    if "bookings" in user_data and user_data["bookings"]:
-        bookings_df = pd.DataFrame(user_data["bookings"])
-        bookings_df.to_csv(f"{username}_bookings.csv", index=False)
-        print(f"✅ Restored bookings data for {username}")
-    
-    # Restore expenses
-    if "expenses" in user_data and user_data["expenses"]:
-        expenses_df = pd.DataFrame(user_data["expenses"])
-        expenses_df.to_csv(f"{username}_expenses.csv", index=False)
-        print(f"✅ Restored expenses data for {username}")
+    # Restore tables as Parquet — the app reads that first, so restoring
+    # to CSV would be shadowed by any stale Parquet file
+    for table in ("cars", "bookings", "expenses"):
+        if table in user_data and user_data[table]:
+            table_df = frame_from_payload(user_data[table])
+            table_df.to_parquet(f"{username}_{table}.parquet", index=False)
+            print(f"✅ Restored {table} data for {username}")
 
 def list_backups():
     """List available backup files"""
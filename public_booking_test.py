@@ -6,9 +6,11 @@ Run this to test the URL parameter handling
 import streamlit as st
 
 st.write("## URL Parameter Test")
-st.write("Current URL parameters:", st.query_params)
+# Snapshot once — each st.query_params access goes through the proxy
+qp = dict(st.query_params)
+st.write("Current URL parameters:", qp)
 
-if st.query_params.get("page") == "booking":
+if qp.get("page") == "booking":
     st.success("✅ Public booking page detected!")
 else:
     st.info("Regular page - add ?page=booking to URL to test")